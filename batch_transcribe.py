@@ -0,0 +1,187 @@
+"""Transcribe a directory of recordings offline, optionally labelling their intents.
+
+Usage:
+    python batch_transcribe.py recordings/ [more.wav ...] -o results.jsonl
+        [--workers 4] [--threads 1] [--parse local|agent] [--model base] [--backend whisper]
+
+Files are spread over a pool of processes; each worker loads the speech
+model once and then transcribes one file at a time, so throughput grows
+with the number of cores. Results are appended to the output as JSON lines
+as soon as each file finishes:
+
+    {"audio": ..., "text": ..., "commands": [...], "audio_seconds": ...,
+     "timings": {"load_ms", "transcribe_ms", "parse_ms"}, "worker": pid}
+
+Running the same command again skips files already in the output, so an
+interrupted run resumes where it stopped (failed files are retried). The
+"audio" paths are relative to the output file, so the results can be used
+directly as a benchmarks/pipeline.py corpus.
+
+--parse local labels each transcript with the offline intent matcher;
+--parse agent uses NagatoAgent.parse_command (local matcher, cache, then
+the LLM from LLM_CLIENT). Commands are only parsed, never executed.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.vad import resample, to_float32
+
+load_dotenv()
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg")
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+
+def find_audio(paths):
+    """Audio files given directly or found under the given directories, sorted"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for extension in AUDIO_EXTENSIONS:
+                files.extend(glob.glob(os.path.join(path, "**", f"*{extension}"), recursive=True))
+        else:
+            files.append(path)
+    return sorted(set(os.path.abspath(path) for path in files))
+
+
+def load_audio(path):
+    """Mono float32 16 kHz samples; WAV is read directly, other formats through ffmpeg"""
+    if not path.lower().endswith(".wav"):
+        import whisper
+        return whisper.load_audio(path)
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    audio = resample(to_float32(pcm.reshape(-1, channels)), rate, 16000)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def completed_files(output, base):
+    """Absolute paths already transcribed successfully in an earlier run"""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output) as f:
+        for line in f:
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short when the previous run was killed
+            if not item.get("error"):
+                done.add(os.path.abspath(os.path.join(base, item["audio"])))
+    return done
+
+
+def _init_worker(backend, model, device, threads, parse):
+    # One torch thread per worker by default: the pool, not torch, spreads work over the cores
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    from services.stt_backends import create_backend
+
+    _worker["backend"] = create_backend(backend, model, device).load()
+    if parse == "local":
+        from services.intent_matcher import IntentMatcher
+        matcher = IntentMatcher()
+        _worker["parse"] = lambda text: [command for command, _ in [matcher.match(text)] if command]
+    elif parse == "agent":
+        from services.nagato_agent import NagatoAgent
+        _worker["parse"] = NagatoAgent().parse_command
+
+
+def _transcribe_file(path):
+    record = {"path": path, "worker": os.getpid(), "timings": {}}
+    try:
+        start = time.perf_counter()
+        audio = load_audio(path)
+        record["audio_seconds"] = len(audio) / 16000
+        record["timings"]["load_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        text = _worker["backend"].transcribe(audio)["text"].strip() if len(audio) else ""
+        record["text"] = text
+        record["timings"]["transcribe_ms"] = (time.perf_counter() - start) * 1000
+
+        if "parse" in _worker and text:
+            start = time.perf_counter()
+            commands = _worker["parse"](text.lower())
+            record["commands"] = [command.model_dump(mode="json") for command in commands]
+            record["timings"]["parse_ms"] = (time.perf_counter() - start) * 1000
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="Audio files or directories (searched recursively)")
+    parser.add_argument("-o", "--output", default="transcripts.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per worker")
+    parser.add_argument("--parse", choices=["local", "agent"], help="Also label each transcript's intents")
+    parser.add_argument("--model", default=os.getenv('WHISPER_MODEL', 'base'))
+    parser.add_argument("--backend", default=os.getenv('STT_BACKEND', 'whisper'))
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    base = os.path.dirname(os.path.abspath(args.output))
+    files = find_audio(args.inputs)
+    done = completed_files(args.output, base)
+    pending = [path for path in files if path not in done]
+    print(f"{len(files)} files, {len(files) - len(pending)} already done, "
+          f"{len(pending)} to transcribe with {args.workers} workers")
+    if not pending:
+        return
+
+    # Spawned workers do not inherit torch state or threads from this process
+    context = multiprocessing.get_context("spawn")
+    workers = min(args.workers, len(pending))
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    failures = 0
+    with context.Pool(workers, _init_worker,
+                      (args.backend, args.model, args.device, args.threads, args.parse)) as pool, \
+            open(args.output, "a") as output:
+        try:
+            for n, record in enumerate(pool.imap_unordered(_transcribe_file, pending), 1):
+                path = record.pop("path")
+                record = {"audio": os.path.relpath(path, base), **record}
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+
+                audio_seconds += record.get("audio_seconds", 0.0)
+                elapsed = time.perf_counter() - start
+                eta = elapsed / n * (len(pending) - n)
+                if record.get("error"):
+                    failures += 1
+                    status = f"FAILED {record['error']}"
+                else:
+                    status = f"{record['timings']['transcribe_ms']:.0f} ms  {record['text'][:60]!r}"
+                print(f"[{n}/{len(pending)}] {record['audio']}  {status}  (eta {eta:.0f}s)", file=sys.stderr)
+        except KeyboardInterrupt:
+            pool.terminate()
+            print("Interrupted; run again to resume", file=sys.stderr)
+            return
+
+    elapsed = time.perf_counter() - start
+    print(f"\nTranscribed {len(pending) - failures} files ({failures} failed), {audio_seconds:.1f} s of audio "
+          f"in {elapsed:.1f} s: {audio_seconds / elapsed:.1f}x real time with {workers} workers")
+
+
+if __name__ == "__main__":
+    main()
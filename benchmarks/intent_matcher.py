@@ -0,0 +1,68 @@
+"""Hit rate, accuracy and latency of the local intent matcher.
+
+Usage:
+    python benchmarks/intent_matcher.py [benchmarks/data/intent_corpus.jsonl]
+
+Each corpus line is {"text": ..., "expected": {"type": ..., "content": ...}}
+or {"text": ..., "expected": null} for utterances that should fall back to
+the LLM.
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_matcher import IntentMatcher
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_corpus.jsonl")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS
+    with open(corpus_path) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    matcher = IntentMatcher()
+    hits = correct = false_hits = 0
+    expected_local = sum(1 for item in corpus if item["expected"])
+    latencies = []
+
+    for item in corpus:
+        start = time.perf_counter()
+        command, confidence = matcher.match(item["text"])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        local = command is not None and confidence >= matcher.threshold
+        expected = item["expected"]
+        if not local:
+            if expected:
+                print(f"MISS   {item['text']!r} (confidence {confidence:.2f})")
+            continue
+
+        hits += 1
+        result = {"type": command.type.value, "content": command.content}
+        if result == expected:
+            correct += 1
+        elif expected is None:
+            false_hits += 1
+            print(f"WRONG  {item['text']!r} -> {result} (should use LLM)")
+        else:
+            print(f"WRONG  {item['text']!r} -> {result}, expected {expected}")
+
+    print()
+    print(f"utterances:      {len(corpus)}")
+    print(f"local hit rate:  {hits / len(corpus):.0%} ({hits}/{len(corpus)})")
+    print(f"recall:          {correct / max(expected_local, 1):.0%} of locally resolvable commands")
+    print(f"accuracy:        {correct / max(hits, 1):.0%} of local hits ({false_hits} should have used the LLM)")
+    print(f"latency:         p50 {percentile(latencies, 0.5):.3f} ms, p95 {percentile(latencies, 0.95):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Load-test a running server.py: throughput and latency versus client count.
+
+Usage:
+    python server.py &
+    python benchmarks/load_test.py recording.wav [more.wav ...] [--url http://127.0.0.1:8765]
+        [--clients 1,2,4,8] [--requests 20] [--endpoint transcribe|command]
+
+For each client count, that many threads post the WAV files round-robin
+(--requests each) and the run reports requests per second, p50/p95
+latency and the mean Whisper batch size the server formed, read from its
+/stats before and after. /command only parses (the server's default), so
+no actions run on the server's desktop. --token (default SERVER_TOKEN) is
+sent as a bearer token when the server requires one.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tracing import percentile
+
+# Authorization header for every request, set from --token
+AUTH_HEADERS = {}
+
+
+def get_json(url):
+    with urllib.request.urlopen(urllib.request.Request(url, headers=AUTH_HEADERS)) as response:
+        return json.load(response)
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "audio/wav", **AUTH_HEADERS})
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        json.load(response)
+    return time.perf_counter() - start
+
+
+def run_level(url, bodies, clients, requests):
+    """Run `clients` concurrent clients; returns (latencies, wall seconds, errors)"""
+    def client(index):
+        latencies, errors = [], 0
+        for n in range(requests):
+            try:
+                latencies.append(post(url, bodies[(index + n) % len(bodies)]))
+            except Exception as e:
+                errors += 1
+                print(f"  request failed: {e}")
+        return latencies, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    wall = time.perf_counter() - start
+    latencies = [latency for result, _ in results for latency in result]
+    return latencies, wall, sum(errors for _, errors in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio", nargs="+", help="16-bit PCM WAV files to send")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--clients", default="1,2,4,8", help="comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--endpoint", choices=["transcribe", "command"], default="transcribe")
+    parser.add_argument("--token", default=os.getenv('SERVER_TOKEN', ''))
+    args = parser.parse_args()
+    if args.token:
+        AUTH_HEADERS["Authorization"] = f"Bearer {args.token}"
+
+    bodies = []
+    for path in args.audio:
+        with open(path, "rb") as f:
+            bodies.append(f.read())
+    target = f"{args.url}/{args.endpoint}"
+
+    health = get_json(f"{args.url}/health")
+    print(f"Server model: {health['model']}")
+    # Warm-up, so model loading is not part of the first level
+    post(target, bodies[0])
+
+    print(f"{'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'batch':>6} {'errors':>6}")
+    for clients in [int(count) for count in args.clients.split(",")]:
+        before = get_json(f"{args.url}/stats")["batching"]
+        latencies, wall, errors = run_level(target, bodies, clients, args.requests)
+        after = get_json(f"{args.url}/stats")["batching"]
+
+        batches = after["batches"] - before["batches"]
+        batch_size = (after["completed"] - before["completed"]) / batches if batches else 0.0
+        print(f"{clients:>7} {len(latencies) / wall:>8.2f} "
+              f"{percentile(latencies, 0.5) * 1000:>8.0f} {percentile(latencies, 0.95) * 1000:>8.0f} "
+              f"{batch_size:>6.2f} {errors:>6}")
+
+
+if __name__ == "__main__":
+    main()
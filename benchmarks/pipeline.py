@@ -0,0 +1,255 @@
+"""Run a corpus through the full command pipeline offline and report latency.
+
+Usage:
+    python benchmarks/pipeline.py [corpus.jsonl] [--llm fake|replay] [--latency 0.3]
+        [--concurrency 4] [--repeat 3] [--no-local] [--stt --model tiny]
+        [--save-baseline base.json | --baseline base.json --tolerance 0.2]
+
+Each corpus line is {"text": ...}, optionally with "audio": "file.wav"
+(relative to the corpus file). With --stt, entries that have audio are
+transcribed first; otherwise the text is used directly. Every command is
+parsed, executed against a dry-run computer (no apps are opened) and its
+reply streamed, with the LLM replaced by services/fake_llm.py. Per-stage
+latencies come from the tracing spans.
+
+Lines with an "expected" command must run exactly that action, and every
+command must produce a reply; any mismatch is listed and fails the run.
+
+With --baseline the run fails (exit code 1) if throughput drops or any
+stage's p95 grows by more than --tolerance, so it can gate regressions.
+"""
+import argparse
+import contextvars
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Spans of this run go to their own file, not the app's trace log
+TRACE_PATH = os.path.join(tempfile.mkdtemp(prefix="nagato_bench_"), "trace.jsonl")
+os.environ['TRACE_PATH'] = TRACE_PATH
+os.environ['TRACE_ENABLED'] = 'true'
+# The shared agent and processor are created on import; never let them reach the real API
+os.environ.setdefault('LLM_CLIENT', 'fake')
+
+from services.commands import CommandType
+from services.fake_llm import FakeLLMClient, ReplayLLMClient
+from services.tool_registry import tool_registry
+from services.tracing import tracer, traced, load_spans, percentile
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_corpus.jsonl")
+
+# Actions run for the current command; the agent's action threads share it through tracer.bind
+_actions = contextvars.ContextVar("actions")
+
+
+class DryRunComputer:
+    """ComputerControl stand-in that records each action and sleeps for a fixed latency"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def _act(self, method, message, **fields):
+        _actions.get().append((method, fields))
+        if self.latency:
+            time.sleep(self.latency)
+        return message
+
+    @traced("action.open_application")
+    def open_application(self, app_name):
+        return self._act("open_application", f"Opened {app_name}", app_name=app_name)
+
+    @traced("action.adjust_volume")
+    def adjust_volume(self, level):
+        return self._act("adjust_volume", f"Volume set to {level}%", level=level)
+
+    @traced("action.take_screenshot")
+    def take_screenshot(self, filename=None):
+        return self._act("take_screenshot", f"Screenshot saved as {filename or 'screenshot.png'}",
+                         filename=filename)
+
+
+def load_corpus(path):
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path) as f:
+        items = [json.loads(line) for line in f if line.strip()]
+    for item in items:
+        if item.get("audio"):
+            item["audio"] = os.path.join(base, item["audio"])
+    return items
+
+
+def load_wav(path):
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return pcm.reshape(-1, channels), rate
+
+
+def build_stt(model):
+    from services.stt_backends import create_backend
+    from services.vad import resample, to_float32
+
+    backend = create_backend(os.getenv('STT_BACKEND', 'whisper'), model, os.getenv('WHISPER_DEVICE', 'auto')).load()
+
+    def transcribe(path):
+        pcm, rate = load_wav(path)
+        return backend.transcribe(resample(to_float32(pcm), rate, 16000))["text"].strip()
+
+    return transcribe
+
+
+def run_command(processor, item, transcribe):
+    """Run one corpus line; returns its reply and the actions it ran"""
+    actions = []
+    _actions.set(actions)
+    with tracer.trace("command"):
+        text = item["text"]
+        if transcribe and item.get("audio"):
+            with tracer.span("stt.transcribe"):
+                text = transcribe(item["audio"])
+
+        start = time.perf_counter()
+        first = None
+        reply = []
+        for delta in processor.stream_command(text):
+            if first is None:
+                first = tracer.record("first_delta", start)
+            reply.append(delta)
+        return "".join(reply), actions
+
+
+def check_output(item, reply, actions):
+    """Describe what is wrong with a command's output, or return None"""
+    if not reply.strip():
+        return "no reply"
+    expected = item.get("expected")
+    if expected is None:
+        return None
+    tool = tool_registry.for_type(CommandType(expected["type"]))
+    if actions != [(tool.method, expected["content"])]:
+        return f"ran {actions}, expected {[(tool.method, expected['content'])]}"
+    return None
+
+
+def stage_stats(spans):
+    durations = defaultdict(list)
+    for span in spans:
+        durations[span["name"]].append(span["duration_ms"])
+    return {
+        name: {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.5),
+            "p95_ms": percentile(values, 0.95),
+            "max_ms": max(values),
+        }
+        for name, values in durations.items()
+    }
+
+
+def check_baseline(result, baseline, tolerance):
+    """Return a list of regressions against a saved baseline"""
+    failures = []
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        failures.append(f"throughput {result['throughput']:.2f}/s < baseline {baseline['throughput']:.2f}/s")
+    for name, stats in baseline["stages"].items():
+        current = result["stages"].get(name)
+        # 1 ms of slack so sub-millisecond stages do not fail on noise
+        if current and current["p95_ms"] > stats["p95_ms"] * (1 + tolerance) + 1.0:
+            failures.append(f"{name} p95 {current['p95_ms']:.1f}ms > baseline {stats['p95_ms']:.1f}ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS)
+    parser.add_argument("--llm", choices=["fake", "replay"], default="fake")
+    parser.add_argument("--replay-path", help="Recorded responses for --llm replay")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake LLM seconds to first token")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Fake LLM seconds per streamed chunk")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--action-latency", type=float, default=0.0, help="Dry-run seconds per action")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-local", action="store_true", help="Send everything to the LLM")
+    parser.add_argument("--cache", action="store_true", help="Enable the command cache")
+    parser.add_argument("--stt", action="store_true", help="Transcribe entries that have audio")
+    parser.add_argument("--model", default=os.getenv('WHISPER_MODEL', 'base'))
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if not args.cache:
+        os.environ['COMMAND_CACHE'] = 'false'
+    from services.nagato_agent import NagatoAgent
+    from services.process_command import CommandProcessor
+
+    options = dict(latency=args.latency, token_latency=args.token_latency, jitter=args.jitter, seed=0)
+    if args.llm == "replay":
+        client = ReplayLLMClient(path=args.replay_path, **options)
+    else:
+        client = FakeLLMClient(**options)
+    agent = NagatoAgent(client=client, computer=DryRunComputer(args.action_latency))
+    if args.no_local:
+        agent.intent_matcher.threshold = float("inf")
+    processor = CommandProcessor(client=client, agent=agent)
+    transcribe = build_stt(args.model) if args.stt else None
+
+    corpus = load_corpus(args.corpus) * args.repeat
+    print(f"{len(corpus)} commands, concurrency {args.concurrency}, {args.llm} LLM "
+          f"({args.latency * 1000:.0f}ms first token)\n")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        outputs = list(pool.map(lambda item: run_command(processor, item, transcribe), corpus))
+    elapsed = time.perf_counter() - start
+    mismatches = [(item["text"], problem) for item, output in zip(corpus, outputs)
+                  for problem in [check_output(item, *output)] if problem]
+
+    result = {
+        "commands": len(corpus),
+        "seconds": elapsed,
+        "throughput": len(corpus) / elapsed,
+        "stages": stage_stats(load_spans(TRACE_PATH)),
+    }
+
+    print(f"{'stage':<26}{'count':>7}{'p50 (ms)':>11}{'p95 (ms)':>11}{'max (ms)':>11}")
+    for name in sorted(result["stages"]):
+        stats = result["stages"][name]
+        print(f"{name:<26}{stats['count']:>7}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}{stats['max_ms']:>11.1f}")
+    print(f"\nthroughput: {result['throughput']:.2f} commands/s ({elapsed:.2f}s total)")
+    if args.llm == "replay":
+        print(f"replay misses: {client.misses}")
+    for text, problem in mismatches:
+        print(f"MISMATCH  {text!r}: {problem}")
+    print(f"{len(corpus) - len(mismatches)}/{len(corpus)} commands produced the expected output")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures = check_baseline(result, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION  {failure}")
+        if failures:
+            sys.exit(1)
+        print("No regressions against baseline")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
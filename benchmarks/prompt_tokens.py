@@ -0,0 +1,58 @@
+"""Prompt size of the parse request: system prompt, tool schemas and a user message.
+
+Usage:
+    python benchmarks/prompt_tokens.py ["open firefox and set the volume to 30"]
+
+Counts tokens with tiktoken when it is installed (cl100k_base), otherwise
+estimates four characters per token. The system prompt and tool schemas
+are sent with every parse request, so they set the floor for its
+prompt-processing latency.
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['COMMAND_CACHE'] = 'false'
+# The shared agent is created on import; never let it reach the real API
+os.environ.setdefault('LLM_CLIENT', 'fake')
+
+from services.fake_llm import FakeLLMClient
+from services.nagato_agent import NagatoAgent
+
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return (lambda text: len(encoding.encode(text))), "tiktoken cl100k_base"
+    except ImportError:
+        return (lambda text: len(text) // 4), "estimate (4 characters per token)"
+
+
+def main():
+    text = sys.argv[1] if len(sys.argv) > 1 else "open firefox and set the volume to 30"
+    count, method = token_counter()
+
+    agent = NagatoAgent(client=FakeLLMClient(latency=0))
+    request = agent._llm_request(text)
+    system = request["messages"][0]["content"]
+
+    print(f"Token counts ({method})\n")
+    rows = [("system prompt", count(system))]
+    for tool in request["tools"]:
+        rows.append((f"tool {tool['function']['name']}", count(json.dumps(tool, separators=(",", ":")))))
+    rows.append(("user message", count(text)))
+    for name, tokens in rows:
+        print(f"{name:<28}{tokens:>6}")
+    print(f"{'total':<28}{sum(tokens for _, tokens in rows):>6}")
+
+    # The static part must be byte-identical between requests
+    other = agent._llm_request("take a screenshot")
+    stable = other["tools"] is request["tools"] and other["messages"][0] == request["messages"][0]
+    print(f"\nstatic prefix reused across requests: {'yes' if stable else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Measure speculative intent parsing offline: hit rate and latency saved.
+
+Usage:
+    python benchmarks/speculation.py [corpus.jsonl] [--latency 0.3] [--word-time 0.35]
+        [--interval 1.0] [--silence 0.8] [--first-pass 0.3] [--decode 0.3]
+        [--error-rate 0.1] [--stable 2] [--concurrency 8] [--no-local]
+
+Each corpus utterance is replayed the way the streaming transcriber sees
+it: a word is spoken every --word-time seconds and the words so far are
+offered as a partial every --interval seconds. After --first-pass seconds
+of silence the whole utterance is decoded (taking --decode seconds) and
+offered as stable; the final transcript arrives once that decode is done
+and the VAD has waited --silence seconds. With probability --error-rate
+the final decode changes the last word instead (as if speech resumed), so
+the speculation has to be discarded.
+Parsing goes through NagatoAgent with the fake LLM (--latency). For every
+utterance the wait from final transcript to parsed commands is measured
+with the speculation and, for comparison, by parsing the final text anew.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ['COMMAND_CACHE'] = 'false'
+# The shared agent is created on import; never let it reach the real API
+os.environ.setdefault('LLM_CLIENT', 'fake')
+os.environ['TRACE_ENABLED'] = 'false'
+
+from services.fake_llm import FakeLLMClient
+from services.nagato_agent import NagatoAgent
+from services.speculative_parser import SpeculativeParser
+from services.tracing import percentile
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intent_corpus.jsonl")
+
+
+def replay(item, speculator, agent, args, rng):
+    words = item["text"].split()
+    final = list(words)
+    if rng.random() < args.error_rate:
+        final[-1] = "something"
+    final_text = " ".join(final).lower()
+
+    speculation = speculator.begin()
+    speech_end = len(words) * args.word_time
+    first_pass = speech_end + args.first_pass + args.decode
+    start = time.perf_counter()
+    tick = args.interval
+    while tick < speech_end:
+        time.sleep(max(0.0, start + tick - time.perf_counter()))
+        heard = words[:int(tick / args.word_time)]
+        if heard:
+            speculation.offer(" ".join(heard))
+        tick += args.interval
+    time.sleep(max(0.0, start + first_pass - time.perf_counter()))
+    speculation.offer(" ".join(words), stable=True)
+    final_at = max(first_pass, speech_end + args.silence)
+    if final != words:
+        final_at += args.decode
+    time.sleep(max(0.0, start + final_at - time.perf_counter()))
+
+    resolved = time.perf_counter()
+    future = speculation.resolve(final_text)
+    if future is not None:
+        future.result()
+    with_speculation = time.perf_counter() - resolved
+
+    begin = time.perf_counter()
+    agent.parse_command(final_text)
+    without = time.perf_counter() - begin
+    if future is None:
+        # A miss parses the final text afterwards, exactly as without speculation
+        with_speculation += without
+    return with_speculation, without
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake LLM seconds per parse")
+    parser.add_argument("--word-time", type=float, default=0.35)
+    parser.add_argument("--interval", type=float, default=float(os.getenv('STREAM_INTERVAL', 1.0)))
+    parser.add_argument("--silence", type=float, default=float(os.getenv('VAD_SILENCE_DURATION', 0.8)))
+    parser.add_argument("--first-pass", type=float, default=float(os.getenv('FIRST_PASS_SILENCE', 0.3)))
+    parser.add_argument("--decode", type=float, default=0.3, help="Seconds per Whisper decode")
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--stable", type=int, default=2, help="Identical partials before speculating")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--no-local", action="store_true", help="Send everything to the LLM")
+    args = parser.parse_args()
+
+    agent = NagatoAgent(client=FakeLLMClient(latency=args.latency, token_latency=0.0, seed=0))
+    if args.no_local:
+        agent.intent_matcher.threshold = float("inf")
+    speculator = SpeculativeParser(agent=agent, enabled=True, stable_partials=args.stable,
+                                   max_workers=args.concurrency)
+
+    with open(args.corpus) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    rngs = [random.Random(i) for i in range(len(corpus))]
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda pair: replay(pair[0], speculator, agent, args, pair[1]),
+                                zip(corpus, rngs)))
+
+    stats = speculator.stats()
+    with_speculation = [seconds * 1000 for seconds, _ in results]
+    without = [seconds * 1000 for _, seconds in results]
+    print(f"{len(corpus)} utterances, {args.latency * 1000:.0f}ms LLM, {args.decode * 1000:.0f}ms decode\n")
+    print(f"speculations started: {stats['started']} ({stats['discarded']} replaced by a newer partial)")
+    print(f"committed:            {stats['committed']}  missed: {stats['missed']}  "
+          f"hit rate: {stats['hit_rate']:.0%}")
+    print(f"saved per hit:        {stats['mean_saved_ms']:.1f}ms mean")
+    print("\nfinal transcript -> parsed commands")
+    print(f"  without speculation: p50 {percentile(without, 0.5):.1f}ms  p95 {percentile(without, 0.95):.1f}ms")
+    print(f"  with speculation:    p50 {percentile(with_speculation, 0.5):.1f}ms  "
+          f"p95 {percentile(with_speculation, 0.95):.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Startup benchmark: import cost of services.vtt and time to first transcript.
+
+Usage:
+    python benchmarks/startup.py [--audio path/to/command.wav] [--model base]
+
+Each measurement runs in a fresh interpreter so module caches do not hide
+import costs.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import time, json
+start = time.perf_counter()
+import services.vtt
+print(json.dumps({"import_vtt": time.perf_counter() - start}))
+"""
+
+FIRST_TRANSCRIPT_SNIPPET = """
+import time, json, sys, wave
+import numpy as np
+start = time.perf_counter()
+from services.model_manager import model_manager
+model_manager.preload({model!r})
+from services.vtt import vtt_service
+imported = time.perf_counter() - start
+
+audio_path = {audio!r}
+if audio_path:
+    with wave.open(audio_path, 'rb') as wf:
+        rate = wf.getframerate()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    audio = vtt_service.prepare_audio(pcm, rate)
+else:
+    audio = np.zeros(16000, dtype=np.float32)
+
+vtt_service.set_model({model!r})
+text = vtt_service.transcribe_audio(audio)
+print(json.dumps({{
+    "import_and_preload": imported,
+    "model_load": model_manager.load_time({model!r}),
+    "time_to_first_transcript": time.perf_counter() - start,
+    "text": text.strip(),
+}}))
+"""
+
+
+def run_snippet(code):
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    # Services print progress; the measurement is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--audio", help="WAV file to transcribe (defaults to 1 s of silence)")
+    parser.add_argument("--model", default=os.getenv('WHISPER_MODEL', 'base'))
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    import_times = [run_snippet(IMPORT_SNIPPET)["import_vtt"] for _ in range(args.runs)]
+    print(f"import services.vtt: best {min(import_times) * 1000:.1f} ms "
+          f"over {args.runs} runs")
+
+    audio = os.path.abspath(args.audio) if args.audio else None
+    first = run_snippet(FIRST_TRANSCRIPT_SNIPPET.format(model=args.model, audio=audio))
+    print(f"import + preload start: {first['import_and_preload'] * 1000:.1f} ms")
+    print(f"model load ({args.model}): {first['model_load']:.2f} s")
+    print(f"time to first transcript: {first['time_to_first_transcript']:.2f} s")
+    if first["text"]:
+        print(f"transcript: {first['text']}")
+
+
+if __name__ == "__main__":
+    main()
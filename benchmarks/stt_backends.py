@@ -0,0 +1,123 @@
+"""Compare speech-to-text backends on a directory of WAV fixtures.
+
+Usage:
+    python benchmarks/stt_backends.py [path/to/fixtures] [--backends whisper,whisper-int8]
+
+Every `name.wav` in the fixtures directory needs a `name.txt` next to it
+holding the reference transcript. Without a directory, the short spoken
+commands in benchmarks/data/stt are used. For each backend the script reports load
+time, real-time factor (processing time / audio duration, lower is better)
+and word error rate against the references.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.intent_matcher import NUMBER_WORDS, normalize_text
+from services.stt_backends import BACKENDS, create_backend
+from services.vad import resample, to_float32
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "stt")
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for wav_path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        txt_path = os.path.splitext(wav_path)[0] + ".txt"
+        if not os.path.exists(txt_path):
+            print(f"Skipping {wav_path}: no reference transcript")
+            continue
+        with wave.open(wav_path, 'rb') as wf:
+            rate = wf.getframerate()
+            channels = wf.getnchannels()
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        pcm = pcm.reshape(-1, channels)
+        with open(txt_path) as f:
+            reference = f.read()
+        fixtures.append((os.path.basename(wav_path), pcm, rate, reference))
+    return fixtures
+
+
+# Longest first, so "one hundred" is replaced before "hundred"
+NUMBER = re.compile(r"\b(" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")\b")
+
+
+def normalize(text):
+    """Words as the intent matcher sees them, with number words as digits ("thirty" == "30")"""
+    return NUMBER.sub(lambda match: str(NUMBER_WORDS[match.group(1)]), normalize_text(text)).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level Levenshtein distance"""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1], len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", nargs="?", default=DEFAULT_FIXTURES,
+                        help="Directory of .wav files with matching .txt references")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--model", default=os.getenv('WHISPER_MODEL', 'base'))
+    parser.add_argument("--device", default=os.getenv('WHISPER_DEVICE', 'auto'))
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures found in {args.fixtures}")
+
+    audio = [
+        (name, np.ascontiguousarray(resample(to_float32(pcm), rate, 16000), dtype=np.float32), reference)
+        for name, pcm, rate, reference in fixtures
+    ]
+    total_audio = sum(len(samples) for _, samples, _ in audio) / 16000
+
+    print(f"{len(audio)} fixtures, {total_audio:.1f} s of audio, model {args.model}\n")
+    print(f"{'backend':<16}{'load (s)':>10}{'RTF':>8}{'WER':>8}")
+
+    for backend_name in args.backends.split(","):
+        try:
+            start = time.perf_counter()
+            backend = create_backend(backend_name, args.model, args.device).load()
+            load_time = time.perf_counter() - start
+        except Exception as e:
+            print(f"{backend_name:<16}failed to load: {e}")
+            continue
+
+        # Warm up once so one-off kernel initialisation is not counted
+        backend.transcribe(audio[0][1])
+
+        errors = words = 0
+        processing = 0.0
+        for name, samples, reference in audio:
+            start = time.perf_counter()
+            hypothesis = backend.transcribe(samples)["text"]
+            processing += time.perf_counter() - start
+            file_errors, file_words = word_errors(reference, hypothesis)
+            errors += file_errors
+            words += file_words
+
+        print(f"{backend_name:<16}{load_time:>10.2f}{processing / total_audio:>8.3f}"
+              f"{errors / max(words, 1):>8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Summarize recorded command traces: p50/p95 per stage, optionally per day.
+
+Usage:
+    python benchmarks/trace_report.py [--path logs/trace.jsonl] [--by-day] [--since-hours 24]
+
+Reads the JSON lines written by services/tracing.py, including rotated
+backups, and prints count, p50 and p95 milliseconds for each span name
+(command, listen, stt.capture, stt.transcribe, parse, llm.stream,
+execute, action.*, ui.render, ...).
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.tracing import load_spans, percentile
+
+
+def print_table(spans):
+    durations = defaultdict(list)
+    for span in spans:
+        durations[span["name"]].append(span["duration_ms"])
+
+    print(f"{'span':<26}{'count':>7}{'p50 (ms)':>11}{'p95 (ms)':>11}")
+    for name in sorted(durations):
+        values = durations[name]
+        print(f"{name:<26}{len(values):>7}{percentile(values, 0.5):>11.0f}{percentile(values, 0.95):>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default=os.getenv('TRACE_PATH', 'logs/trace.jsonl'))
+    parser.add_argument("--by-day", action="store_true", help="One table per calendar day")
+    parser.add_argument("--since-hours", type=float, help="Only include recent spans")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if args.since_hours:
+        cutoff = time.time() - args.since_hours * 3600
+        spans = [span for span in spans if span["time"] >= cutoff]
+    if not spans:
+        sys.exit(f"No spans found in {args.path}")
+
+    traces = len({span["trace"] for span in spans if span["trace"]})
+    print(f"{len(spans)} spans from {traces} commands\n")
+
+    if not args.by_day:
+        print_table(spans)
+        return
+
+    days = defaultdict(list)
+    for span in spans:
+        days[datetime.date.fromtimestamp(span["time"])].append(span)
+    for day in sorted(days):
+        print(day.isoformat())
+        print_table(days[day])
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Window-ready time of NagatoUI with the image gradient vs the old per-line gradient.
+
+Usage:
+    python benchmarks/ui_startup.py [--runs 10]
+
+Needs a display; on a headless box run it under Xvfb (xvfb-run python ...).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nagato_ui import NagatoUI
+
+
+def line_gradient(self, canvas, color1, color2, width=400, height=600):
+    """The previous implementation: one canvas line item per row"""
+    self.gradient_size = (width, height)
+    for i in range(height):
+        r1, g1, b1 = [int(color1[j:j+2], 16) for j in (1, 3, 5)]
+        r2, g2, b2 = [int(color2[j:j+2], 16) for j in (1, 3, 5)]
+        r = int(r1 + (r2 - r1) * i / height)
+        g = int(g1 + (g2 - g1) * i / height)
+        b = int(b1 + (b2 - b1) * i / height)
+        canvas.create_line(0, i, width, i, fill=f'#{r:02x}{g:02x}{b:02x}')
+
+
+def window_ready_time():
+    start = time.perf_counter()
+    root = tk.Tk()
+    app = NagatoUI(root)
+    root.update()
+    elapsed = time.perf_counter() - start
+    items = len(app.bg_canvas.find_all())
+    root.destroy()
+    return elapsed, items
+
+
+def measure(runs):
+    times = []
+    for _ in range(runs):
+        elapsed, items = window_ready_time()
+        times.append(elapsed * 1000)
+    return statistics.median(times), min(times), items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    image = measure(args.runs)
+    image_gradient = NagatoUI.create_gradient
+    NagatoUI.create_gradient = line_gradient
+    try:
+        lines = measure(args.runs)
+    finally:
+        NagatoUI.create_gradient = image_gradient
+
+    print(f"{'gradient':<10}{'median (ms)':>14}{'best (ms)':>12}{'canvas items':>15}")
+    for name, (median, best, items) in (("lines", lines), ("image", image)):
+        print(f"{name:<10}{median:>14.1f}{best:>12.1f}{items:>15}")
+
+
+if __name__ == "__main__":
+    main()
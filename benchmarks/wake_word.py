@@ -0,0 +1,71 @@
+"""Measure wake word detection and idle CPU cost on prerecorded WAV files.
+
+Usage:
+    python benchmarks/wake_word.py recording.wav [more.wav ...] [--phrase "hey nagato"]
+
+Each file is fed through the same VAD-gated detector the UI uses, in 30 ms
+blocks, without a microphone. Files named `*_wake.wav` are expected to
+contain the wake phrase; any other file counts a detection as a false
+alarm. CPU is reported as a percentage of one core per second of audio,
+for the VAD loop alone and for the whole run including decodes.
+"""
+import argparse
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.model_manager import model_manager
+from services.wake_word import WakeWordDetector
+
+
+def load_wav(path):
+    with wave.open(path, 'rb') as wf:
+        rate = wf.getframerate()
+        channels = wf.getnchannels()
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return pcm.reshape(-1, channels), rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="WAV recordings")
+    parser.add_argument("--phrase", default=os.getenv('WAKE_WORD', 'hey nagato'))
+    parser.add_argument("--model", default=os.getenv('WAKE_WORD_MODEL', 'tiny'))
+    args = parser.parse_args()
+
+    detector = WakeWordDetector(phrase=args.phrase, model_name=args.model)
+    # Load up front so model loading is not billed to the idle loop
+    model_manager.get(args.model)
+
+    hits = misses = false_alarms = 0
+    cpu_start = time.process_time()
+    for path in args.files:
+        pcm, rate = load_wav(path)
+        detections = detector.detect_in_audio(pcm, rate)
+        expected = os.path.basename(path).endswith("_wake.wav")
+        if expected:
+            hits += bool(detections)
+            misses += not detections
+            false_alarms += max(0, len(detections) - 1)
+        else:
+            false_alarms += len(detections)
+        times = ", ".join(f"{t:.2f}s" for t in detections) or "none"
+        print(f"{os.path.basename(path):<32} detections: {times}")
+    cpu = time.process_time() - cpu_start
+
+    stats = detector.stats()
+    audio = max(stats["listened_seconds"], 1e-9)
+    print(f"\n{audio:.1f} s of audio, phrase '{args.phrase}', model {args.model}")
+    print(f"hits {hits}, misses {misses}, false alarms {false_alarms}")
+    print(f"VAD loop CPU:   {stats['vad_cpu_percent']:.2f}% of one core")
+    print(f"Decodes:        {stats['decodes']} ({stats['decode_seconds']:.2f} s)")
+    print(f"Total CPU:      {100 * cpu / audio:.2f}% of one core")
+
+
+if __name__ == "__main__":
+    main()
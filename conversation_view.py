@@ -0,0 +1,63 @@
+import tkinter as tk
+
+class ConversationView:
+    """Scrollable conversation history rendered in a read-only tk.Text.
+
+    Text is only ever appended at the end, so earlier turns are never
+    re-laid out while a new response is typed.
+    """
+
+    def __init__(self, parent, font, fg, bg, max_lines=500):
+        self.max_lines = max_lines
+        self.text = tk.Text(
+            parent,
+            font=font,
+            fg=fg,
+            bg=bg,
+            wrap="word",
+            relief="flat",
+            borderwidth=0,
+            highlightthickness=0,
+            cursor="arrow",
+            height=10,
+            state="disabled"
+        )
+
+    def pack(self, **kwargs):
+        self.text.pack(**kwargs)
+
+    def _at_bottom(self):
+        return self.text.yview()[1] >= 0.999
+
+    def _insert(self, text):
+        follow = self._at_bottom()
+        self.text.config(state="normal")
+        self.text.insert("end-1c", text)
+        self.text.config(state="disabled")
+        # Only auto-scroll if the user has not scrolled back through history
+        if follow:
+            self.text.see("end")
+
+    def begin_turn(self):
+        """Start a new turn below the previous ones"""
+        if self.text.compare("end-1c", "!=", "1.0"):
+            self._insert("\n\n")
+            self._trim()
+
+    def append(self, text):
+        """Append text to the current turn"""
+        if text:
+            self._insert(text)
+
+    def _trim(self):
+        # Drop the oldest lines once the history gets long
+        lines = int(self.text.index("end-1c").split(".")[0])
+        if lines > self.max_lines:
+            self.text.config(state="normal")
+            self.text.delete("1.0", f"{lines - self.max_lines}.0")
+            self.text.config(state="disabled")
+
+    def clear(self):
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
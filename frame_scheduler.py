@@ -0,0 +1,85 @@
+import time
+from collections import deque
+
+class FrameScheduler:
+    """Drives every UI animation from one Tk `after` loop at a target frame rate.
+
+    Animations are callbacks taking the seconds elapsed since the previous
+    frame; returning False removes them. The loop only runs while at least
+    one animation is registered. Frame timings are kept for inspection via
+    stats().
+    """
+
+    def __init__(self, root, fps=60, history=600, clock=time.perf_counter):
+        self.root = root
+        self.fps = fps
+        self.frame_budget = 1.0 / fps
+        self.clock = clock
+        self._animations = {}
+        self._job = None
+        self._last_frame = None
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.frame_times = deque(maxlen=history)  # Work done per frame, seconds
+
+    def add(self, name, callback):
+        """Register (or replace) an animation and make sure the loop is running"""
+        self._animations[name] = callback
+        if self._job is None:
+            self._last_frame = None
+            self._job = self.root.after(0, self._tick)
+
+    def remove(self, name):
+        self._animations.pop(name, None)
+
+    def is_active(self, name):
+        return name in self._animations
+
+    def stop(self):
+        self._animations.clear()
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        now = self.clock()
+        dt = self.frame_budget if self._last_frame is None else now - self._last_frame
+        self._last_frame = now
+
+        self.step(dt)
+
+        if self._animations:
+            # Sleep for whatever is left of this frame's budget
+            work = self.clock() - now
+            delay = max(1, int((self.frame_budget - work) * 1000))
+            self._job = self.root.after(delay, self._tick)
+
+    def step(self, dt):
+        """Run one frame with the given elapsed time; usable without a Tk loop"""
+        start = self.clock()
+        # Frames that should have happened in the gap count as dropped
+        if dt > self.frame_budget * 1.5:
+            self.dropped_frames += int(dt / self.frame_budget) - 1
+
+        for name, callback in list(self._animations.items()):
+            if callback(dt) is False and self._animations.get(name) is callback:
+                del self._animations[name]
+
+        self.frames += 1
+        self.frame_times.append(self.clock() - start)
+
+    def stats(self):
+        """Frame count, dropped frames and frame-time percentiles in milliseconds"""
+        times = sorted(self.frame_times)
+        if not times:
+            return {"frames": self.frames, "dropped_frames": self.dropped_frames,
+                    "mean_frame_ms": 0.0, "p95_frame_ms": 0.0, "max_frame_ms": 0.0}
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "mean_frame_ms": sum(times) / len(times) * 1000,
+            "p95_frame_ms": times[min(len(times) - 1, int(0.95 * len(times)))] * 1000,
+            "max_frame_ms": times[-1] * 1000,
+        }
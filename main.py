@@ -1,7 +1,10 @@
 import tkinter as tk
 from nagato_ui import NagatoUI
+from services.model_manager import model_manager
 
 def launch_nagato():
+    # Start loading Whisper right away so it is ready by the first tap
+    model_manager.preload()
     root = tk.Tk()
     app = NagatoUI(root)
     root.mainloop()
@@ -2,7 +2,21 @@ import tkinter as tk
 from tkinter import ttk
 import datetime
 import math
+import os
+import queue
 import random
+import time
+import numpy as np
+from frame_scheduler import FrameScheduler
+from conversation_view import ConversationView
+from services.audio_ring import microphone_buffer
+from services.tracing import tracer
+
+# Pulse cycle: fade out, hold dim, fade in, hold bright (seconds)
+PULSE_FADE = 0.4
+PULSE_HOLD = 0.5
+# Wave time advances 0.05 every 30 ms
+WAVE_TIME_SCALE = 0.05 / 0.03
 
 class NagatoUI:
     def __init__(self, root):
@@ -18,10 +32,27 @@ class NagatoUI:
         self.wave_speeds = [random.uniform(0.1, 0.2) for _ in range(self.wave_points)]
         self.wave_offsets = [random.uniform(0, 2 * math.pi) for _ in range(self.wave_points)]
         self.time = 0
+
+        # Wave tables: the three sine components' spatial phases are fixed per point,
+        # so each frame only needs one vectorized sin over a 3 x points array
+        self.wave_x = np.linspace(0, 200, self.wave_points * 2)  # Double the points for smoother waves
+        self.wave_phases = np.outer([0.05, 0.03, 0.02], self.wave_x)
+        self.wave_rates = np.array([[2.0], [1.5], [1.0]])
+        self.wave_weights = np.array([0.5, 0.3, 0.2])
+        self.wave_coords = np.empty((4, self.wave_points * 4))
+        self.wave_coords[:, 0::2] = self.wave_x
+        self.rng = np.random.default_rng()
+
+        # Live microphone levels per wave line while listening (0-1, smoothed)
+        self.listening = False
+        self.wave_levels = np.zeros(4)
         
         # Pulse animation variables
-        self.pulse_alpha = 1.0
-        self.pulse_increasing = False
+        self.pulse_phase = 0.0
+        self.pulse_color = None
+
+        # All animations share one frame loop
+        self.scheduler = FrameScheduler(self.root, fps=int(os.getenv('UI_FPS', 60)))
         
         # Define font families with fallbacks
         self.title_font = ("Arial", 16, "bold")  # Simplified font definition
@@ -29,22 +60,33 @@ class NagatoUI:
         
         self.setup_ui()
         self.start_pulse_animation()
-        
-    def create_gradient(self, canvas, color1, color2):
-        """Create a vertical gradient on the canvas"""
-        height = 600
-        width = 400
-        for i in range(height):
-            # Calculate color for each line of pixels
-            r1, g1, b1 = [int(color1[i:i+2], 16) for i in (1, 3, 5)]
-            r2, g2, b2 = [int(color2[i:i+2], 16) for i in (1, 3, 5)]
-            
-            r = int(r1 + (r2 - r1) * i / height)
-            g = int(g1 + (g2 - g1) * i / height)
-            b = int(b1 + (b2 - b1) * i / height)
-            
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            canvas.create_line(0, i, width, i, fill=color)
+        self.watch_model_state()
+        self.start_wake_word()
+        self.poll_pipeline()
+        
+    def create_gradient(self, canvas, color1, color2, width=400, height=600):
+        """Draw a vertical gradient on the canvas as a single image"""
+        start = np.array([int(color1[i:i+2], 16) for i in (1, 3, 5)])
+        end = np.array([int(color2[i:i+2], 16) for i in (1, 3, 5)])
+
+        # Compute every row's color in one pass; one pixel wide, stretched below
+        fractions = np.arange(height)[:, None] / height
+        rows = (start + (end - start) * fractions).astype(int)
+        column = " ".join("{#%02x%02x%02x}" % tuple(row) for row in rows)
+
+        strip = tk.PhotoImage(width=1, height=height)
+        strip.put(column)
+        self.gradient_image = strip.zoom(width, 1)
+        self.gradient_size = (width, height)
+
+        canvas.delete("gradient")
+        canvas.create_image(0, 0, anchor="nw", image=self.gradient_image, tags="gradient")
+        canvas.tag_lower("gradient")
+
+    def on_background_resize(self, event):
+        # Only re-render when the size actually changed (ignore the initial 1x1 layout)
+        if event.width > 1 and event.height > 1 and (event.width, event.height) != self.gradient_size:
+            self.create_gradient(self.bg_canvas, '#2C1F4A', '#1A1A2E', event.width, event.height)
         
     def setup_ui(self):
         # Create background canvas for gradient
@@ -59,6 +101,7 @@ class NagatoUI:
         
         # Create gradient background (deep purple to dark blue)
         self.create_gradient(self.bg_canvas, '#2C1F4A', '#1A1A2E')
+        self.bg_canvas.bind("<Configure>", self.on_background_resize)
         
         # Main container
         main_frame = tk.Frame(self.root, bg='#1A1A2E')
@@ -106,194 +149,300 @@ class NagatoUI:
         )
         self.status_label.pack(pady=20)
         
-        # Response area
-        self.response_text = tk.Label(
+        # Response area: scrollable (mouse wheel) history of the conversation
+        self.response_text = ConversationView(
             main_frame,
-            text="",
             font=self.text_font,
             fg="#E0E0E0",
-            bg='#1A1A2E',
-            wraplength=350,
-            justify="left",
-            anchor="w"
+            bg='#1A1A2E'
         )
         self.response_text.pack(pady=20, padx=25, fill=tk.BOTH, expand=True)
+
+        # Optional per-command timing breakdown
+        self.debug_overlay = None
+        if os.getenv('TRACE_OVERLAY', 'false').lower() == 'true':
+            self.debug_overlay = tk.Label(
+                main_frame,
+                font=("Courier", 9),
+                fg="#8888AA",
+                bg='#1A1A2E',
+                justify=tk.LEFT,
+                anchor="w"
+            )
+            self.debug_overlay.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=5)
         
         # Bind click event
         self.root.bind("<Button-1>", self.activate_assistant)
         
         # Initialize typing animation variables
-        self.current_char = 0
-        self.full_response = ""
-        
+        self.pending_text = ""  # Received but not yet typed
+        self.pending_pos = 0
+        self.last_char = ""
+        self.response_done = True
+        self.typing_credit = 0.0
+        self.next_char_delay = 0.0
+        self.request_id = None
+        self.trace_id = None
+        self.render_start = None
+        
+    def watch_model_state(self):
+        """Show the speech model loading state until it is ready"""
+        from services.model_manager import model_manager
+
+        state = model_manager.state()
+        if self.animation_running:
+            return
+        if state == model_manager.LOADING:
+            self.status_label.config(text="Loading speech model...")
+            self.root.after(250, self.watch_model_state)
+        elif state == model_manager.ERROR:
+            self.status_label.config(text="Speech model failed to load")
+        else:
+            self.status_label.config(text="Tap to speak")
+
     def start_pulse_animation(self):
         if not self.animation_running:
-            self.animate_pulse()
+            self.pulse_phase = 0.0
+            self.wave_canvas.itemconfig(self.pulse_circle, state='normal')
+            self.scheduler.add("pulse", self.animate_pulse)
+
+    def pulse_brightness(self, phase):
+        """Brightness (0.2-1.0) of the standby pulse at a point in its cycle"""
+        if phase < PULSE_FADE:
+            return 1.0 - 0.8 * phase / PULSE_FADE
+        phase -= PULSE_FADE
+        if phase < PULSE_HOLD:
+            return 0.2
+        phase -= PULSE_HOLD
+        if phase < PULSE_FADE:
+            return 0.2 + 0.8 * phase / PULSE_FADE
+        return 1.0
     
-    def animate_pulse(self):
+    def animate_pulse(self, dt):
         if self.animation_running:
             # Hide pulse circle during wave animation
             self.wave_canvas.itemconfig(self.pulse_circle, state='hidden')
-            return
-            
-        # Show and animate pulse circle
-        self.wave_canvas.itemconfig(self.pulse_circle, state='normal')
-        
-        # Update alpha for pulsing effect
-        if self.pulse_increasing:
-            self.pulse_alpha += 0.2  # Faster transition
-            if self.pulse_alpha >= 1.0:
-                self.pulse_increasing = False
-                # Wait longer at full brightness
-                self.root.after(500, self.animate_pulse)
-                return
-        else:
-            self.pulse_alpha -= 0.2  # Faster transition
-            if self.pulse_alpha <= 0.2:
-                self.pulse_increasing = True
-                # Wait longer at dim state
-                self.root.after(500, self.animate_pulse)
-                return
-        
-        # Create color based on alpha without using alpha channel
-        r = 0
-        g = 122
-        b = 255
+            return False
+
+        self.pulse_phase = (self.pulse_phase + dt) % (2 * (PULSE_FADE + PULSE_HOLD))
         
         # Adjust brightness instead of alpha
-        factor = self.pulse_alpha
-        color = f'#{int(r*factor):02x}{int(g*factor):02x}{int(b*factor):02x}'
-        
-        self.wave_canvas.itemconfig(
-            self.pulse_circle,
-            outline=color
-        )
-        
-        # Slower pulse rate (500ms for fade + 500ms pause = 1 second cycle)
-        self.root.after(100, self.animate_pulse)
+        factor = self.pulse_brightness(self.pulse_phase)
+        color = f'#{0:02x}{int(122*factor):02x}{int(255*factor):02x}'
+
+        # Holds produce the same color for many frames; skip redundant redraws
+        if color != self.pulse_color:
+            self.pulse_color = color
+            self.wave_canvas.itemconfig(self.pulse_circle, outline=color)
         
-    def animate_waves(self):
+    def animate_waves(self, dt):
         if not self.animation_running:
-            # Hide waves and show pulse
-            for line in self.wave_lines:
-                self.wave_canvas.itemconfig(line, state='hidden')
-            self.wave_canvas.itemconfig(self.pulse_circle, state='normal')
-            return
-            
-        # Hide pulse and show waves
-        self.wave_canvas.itemconfig(self.pulse_circle, state='hidden')
-        for line in self.wave_lines:
-            self.wave_canvas.itemconfig(line, state='normal')
-        
-        self.time += 0.05  # Slower time progression
-        canvas_width = 200
-        canvas_height = 100
-        center_y = canvas_height // 2
-        
-        # Create more natural wave movement
-        for wave_idx, wave_line in enumerate(self.wave_lines):
-            points = []
-            base_amplitude = self.wave_height - (wave_idx * 4)  # Decreasing amplitude for each wave
-            
-            # Add multiple sine waves with different frequencies
-            for i in range(self.wave_points * 2):  # Double the points for smoother waves
-                x = i * canvas_width / (self.wave_points * 2 - 1)
-                
-                # Combine multiple sine waves
-                y = center_y
-                y += math.sin(self.time * 2 + x * 0.05) * base_amplitude * 0.5
-                y += math.sin(self.time * 1.5 + x * 0.03) * base_amplitude * 0.3
-                y += math.sin(self.time + x * 0.02) * base_amplitude * 0.2
-                
-                # Add small random variation
-                y += random.uniform(-0.5, 0.5)
-                
-                points.extend([x, y])
-            
-            self.wave_canvas.coords(wave_line, *points)
+            return False
         
-        self.root.after(30, self.animate_waves)
-        
-    def activate_assistant(self, event=None):
+        self.time += dt * WAVE_TIME_SCALE
+        center_y = 50  # Half the canvas height
+
+        # Shared wave shape, then scaled per line with decreasing amplitude
+        shape = self.wave_weights @ np.sin(self.wave_rates * self.time + self.wave_phases)
+        amplitudes = self.wave_height - 4 * np.arange(len(self.wave_lines))
+
+        if self.listening:
+            # Each line follows one frequency band of the live microphone signal;
+            # fast attack, slow release so the waves don't flicker
+            levels = microphone_buffer.band_levels(bands=len(self.wave_lines))
+            self.wave_levels = np.maximum(levels, self.wave_levels * 0.85)
+            amplitudes = amplitudes * (0.25 + 0.75 * self.wave_levels)
+        self.wave_coords[:, 1::2] = (
+            center_y
+            + amplitudes[:, None] * shape
+            + self.rng.uniform(-0.5, 0.5, (len(self.wave_lines), len(self.wave_x)))  # Small random variation
+        )
+
+        for wave_line, coords in zip(self.wave_lines, self.wave_coords):
+            self.wave_canvas.coords(wave_line, coords.tolist())
+        
+    def start_wake_word(self):
+        """Listen for the wake phrase in the background if enabled"""
+        self.wake_word = None
+        self.wake_events = queue.Queue()
+        if os.getenv('WAKE_WORD_ENABLED', 'false').lower() != 'true':
+            return
+
+        from services.wake_word import WakeWordDetector
+        # Detections arrive on the listener thread; poll_pipeline applies them
+        self.wake_word = WakeWordDetector(on_wake=self.wake_events.put)
+        self.wake_word.start()
+
+    def activate_assistant(self, event=None, command=None):
+        from services.pipeline import command_pipeline
+
+        # A tap while still listening is ignored; otherwise it supersedes the current response
+        if command_pipeline.stage == "listening":
+            return
+        self.cancel_typing()
+
+        # The main capture gets the microphone to itself
+        if self.wake_word and not self.wake_word.pause():
+            print("Wake word listener did not release the microphone in time")
+
         self.animation_running = True
+        self.listening = True
+        self.wave_levels[:] = 0
         self.wave_height = 20
         self.status_label.config(text="Listening...")
-        self.animate_waves()
-        
-        # Start voice recognition in a separate thread to prevent UI freezing
-        self.root.after(100, self.start_voice_recognition)
+
+        # Swap the pulse for the waves
+        self.scheduler.remove("pulse")
+        self.wave_canvas.itemconfig(self.pulse_circle, state='hidden')
+        for line in self.wave_lines:
+            self.wave_canvas.itemconfig(line, state='normal')
+        self.scheduler.add("waves", self.animate_waves)
         
-    def start_voice_recognition(self):
-        from services.vtt import vtt_service
-        import threading
+        # Listening, transcription and the LLM all run off the Tk thread
+        self.request_id = command_pipeline.submit(command)
         
-        def recognition_thread():
+    def poll_pipeline(self):
+        """Apply pipeline results on the Tk thread"""
+        from services.pipeline import command_pipeline
+
+        while True:
             try:
-                command = vtt_service.get_voice_command()
-                # Use after to safely update UI from thread
-                self.root.after(0, self.handle_command, command)
-            except Exception as e:
-                error_message = f"Error: {str(e)}"
-                self.root.after(0, self.handle_error, error_message)
-            
-        thread = threading.Thread(target=recognition_thread)
-        thread.daemon = True
-        thread.start()
-        
-    def handle_command(self, command):
-        self.status_label.config(text="Processing...")
-        self.wave_height = 10
-        
-        # Import and use the command processor
-        from services.process_command import command_processor
-        
-        # Process the command
-        try:
-            response = command_processor.process_command(command)
-            # Start the typing animation
-            self.start_typing_animation(command, response)
-        except Exception as e:
-            self.root.after(1000, lambda: self.show_response(
-                f"Error processing command: {str(e)}"
-            ))
-
-    def start_typing_animation(self, command, response):
-        # Clear previous text
-        self.response_text.config(text="")
+                remainder = self.wake_events.get_nowait()
+            except queue.Empty:
+                break
+            self.activate_assistant(command=remainder or None)
+
+        while True:
+            try:
+                request_id, kind, payload = command_pipeline.events.get_nowait()
+            except queue.Empty:
+                break
+            if request_id != self.request_id:
+                continue  # Result of a superseded request
+
+            if kind == "trace":
+                self.trace_id = payload
+            elif kind == "status":
+                self.status_label.config(text=payload)
+                self.wave_height = 10
+            elif kind == "partial":
+                self.show_partial_transcript(payload)
+            elif kind == "transcript":
+                self.listening = False
+                self.resume_wake_word()
+                self.start_typing_animation(payload)
+            elif kind == "delta":
+                self.append_response(payload)
+            elif kind == "done":
+                self.finish_response()
+            elif kind == "empty":
+                self.listening = False
+                self.resume_wake_word()
+                self.status_label.config(text="Tap to speak")
+                self.show_response_complete()
+            elif kind == "error":
+                self.listening = False
+                self.resume_wake_word()
+                self.handle_error(payload)
+
+        self.root.after(30, self.poll_pipeline)
+
+    def resume_wake_word(self):
+        # The microphone is free again once the command has been captured
+        if self.wake_word:
+            self.wake_word.resume()
+
+    def show_partial_transcript(self, text):
+        # Keep the status line short; show the most recent words
+        if len(text) > 40:
+            text = "..." + text[-37:]
+        self.status_label.config(text=text)
+
+    def cancel_typing(self):
+        self.scheduler.remove("typing")
+
+    def append_response(self, delta):
+        self.pending_text += delta
+
+    def finish_response(self):
+        self.response_done = True
+
+    def start_typing_animation(self, command, response=""):
+        self.render_start = time.perf_counter()
+        # Start a new turn; earlier turns stay in the history untouched
+        self.response_text.begin_turn()
         
-        # Format the conversation
+        # Format the conversation; the response may keep streaming in afterwards
         you_text = "You: " + command + "\n\n"
         nagato_text = "Nagato: " + response
-        full_text = you_text + nagato_text
         
         # Initialize typing animation
-        self.current_char = 0
-        self.full_response = full_text
-        self.type_next_char()
-
-    def type_next_char(self):
-        if self.current_char < len(self.full_response):
-            # Update text with one more character
-            current_text = self.full_response[:self.current_char + 1]
-            self.response_text.config(text=current_text)
-            self.current_char += 1
-            
-            # Random delay between 10ms and 30ms for natural typing effect
-            typing_delay = random.randint(10, 30)
-            
-            # If it's a punctuation mark, add a longer pause
-            if self.current_char < len(self.full_response) and \
-               self.full_response[self.current_char - 1] in '.!?':
-                typing_delay = 200
-            
-            self.root.after(typing_delay, self.type_next_char)
-        else:
-            # Animation complete, reset status
-            self.status_label.config(text="Tap to speak")
-            self.show_response_complete()
+        self.pending_text = you_text + nagato_text
+        self.pending_pos = 0
+        self.last_char = ""
+        self.response_done = bool(response)
+        self.typing_credit = 0.0
+        self.next_char_delay = 0.0
+        self.scheduler.add("typing", self.type_chars)
+
+    def char_delay(self):
+        """Seconds to wait before revealing the next character"""
+        # If text is piling up, catch up in proportion to the backlog (~0.2s to drain)
+        backlog = len(self.pending_text) - self.pending_pos
+        if backlog > 20:
+            return 0.2 / backlog
+        # If it's a punctuation mark, add a longer pause
+        if backlog and self.last_char in '.!?':
+            return 0.2
+        # Random delay between 10ms and 30ms for natural typing effect
+        return random.uniform(0.01, 0.03)
+
+    def type_chars(self, dt):
+        """Append as many characters as the elapsed time allows, in one insert"""
+        start = self.pending_pos
+        self.typing_credit += dt
+        while self.pending_pos < len(self.pending_text) and \
+              self.typing_credit >= self.next_char_delay:
+            self.typing_credit -= self.next_char_delay
+            self.last_char = self.pending_text[self.pending_pos]
+            self.pending_pos += 1
+            self.next_char_delay = self.char_delay()
+
+        if self.pending_pos != start:
+            self.response_text.append(self.pending_text[start:self.pending_pos])
+
+        if self.pending_pos >= len(self.pending_text):
+            # Caught up: don't bank time while waiting for more streamed text
+            self.pending_text = ""
+            self.pending_pos = 0
+            self.typing_credit = 0.0
+            if self.response_done:
+                # Animation complete, reset status
+                self.record_render()
+                self.status_label.config(text="Tap to speak")
+                self.show_response_complete()
+                return False
+
+    def record_render(self):
+        """Close the trace with the time spent typing the response out"""
+        if self.render_start is None:
+            return
+        tracer.record("ui.render", self.render_start, trace_id=self.trace_id)
+        self.render_start = None
+        self.update_debug_overlay()
+
+    def update_debug_overlay(self):
+        if self.debug_overlay is None:
+            return
+        lines = [f"{span.name:<22}{span.duration * 1000:>8.0f} ms" for span in tracer.spans(self.trace_id)]
+        command = tracer.summary().get("command")
+        if command:
+            lines.append(f"{'command p50/p95':<22}{command['p50_ms']:>8.0f} /{command['p95_ms']:.0f} ms")
+        self.debug_overlay.config(text="\n".join(lines))
 
     def show_response_complete(self):
         self.animation_running = False
+        self.scheduler.remove("waves")
         
         # Clear the waves
         for line in self.wave_lines:
@@ -301,14 +450,14 @@ class NagatoUI:
             self.wave_canvas.itemconfig(line, state='hidden')
         
         # Reset and restart pulse animation
-        self.pulse_alpha = 1.0
-        self.pulse_increasing = False
-        self.wave_canvas.itemconfig(self.pulse_circle, state='normal')
-        self.animate_pulse()
+        self.start_pulse_animation()
 
     def handle_error(self, error_message):
         self.status_label.config(text="Error occurred")
-        self.root.after(1000, lambda: self.show_response(f"Sorry, there was an error: {error_message}"))
+        self.cancel_typing()
+        self.response_text.begin_turn()
+        self.response_text.append(f"Sorry, there was an error: {error_message}")
+        self.root.after(1000, self.show_response_complete)
 
 def main():
     root = tk.Tk()
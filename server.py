@@ -0,0 +1,297 @@
+"""Headless Nagato: a local HTTP API for thin voice clients.
+
+Usage:
+    python server.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints (all responses are JSON):
+    POST /transcribe   audio -> {"text", "timings"}
+    POST /command      audio -> {"text", "commands", "response", "timings"}
+    POST /text         {"text": ...} -> same as /command, without transcription
+    GET  /health       server and model state
+    GET  /stats        batching and per-stage latency statistics
+
+Audio is a 16-bit PCM WAV file, or raw 16-bit little-endian mono PCM at
+?sample_rate= (default 16000). Clients that record as they upload can
+stream it with chunked transfer encoding. Bodies larger than
+SERVER_MAX_BODY bytes are refused with 413.
+
+/command and /text only parse by default ("response" is null); pass
+?execute=1 to also run the actions on this machine. When SERVER_TOKEN is
+set, every request must send "Authorization: Bearer <token>".
+
+Transcriptions from concurrent clients are decoded together in batches
+(BATCH_MAX_SIZE clips, waiting at most BATCH_MAX_WAIT seconds for a batch
+to fill).
+"""
+import argparse
+import hmac
+import io
+import json
+import os
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.batch_transcriber import BatchTranscriber
+from services.commands import NagatoResponse
+from services.model_manager import model_manager
+from services.tracing import tracer
+from services.vad import resample, to_float32
+
+load_dotenv()
+
+# Whisper models are trained on 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+
+
+class RequestTooLarge(Exception):
+    """The request body is larger than SERVER_MAX_BODY"""
+
+
+def decode_audio(body, sample_rate=WHISPER_SAMPLE_RATE):
+    """WAV bytes, or raw int16 mono PCM at sample_rate, as float32 16 kHz samples"""
+    if body[:4] == b"RIFF":
+        try:
+            with wave.open(io.BytesIO(body)) as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError("only 16-bit PCM WAV is supported")
+                sample_rate = wav.getframerate()
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+                samples = samples.reshape(-1, wav.getnchannels())
+        except wave.Error as e:
+            raise ValueError(f"invalid WAV file: {e}")
+    else:
+        if len(body) % 2:
+            raise ValueError("raw PCM must be 16-bit samples")
+        samples = np.frombuffer(body, dtype="<i2").astype(np.int16)
+    if sample_rate <= 0:
+        raise ValueError("sample_rate must be a positive number of samples per second")
+    audio = resample(to_float32(samples), sample_rate, WHISPER_SAMPLE_RATE)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+class NagatoServer(ThreadingHTTPServer):
+    """One thread per connection; speech decoding is shared through the batch transcriber"""
+
+    daemon_threads = True
+
+    def __init__(self, address, transcriber=None, agent=None, processor=None, token=None, max_body=None):
+        super().__init__(address, NagatoRequestHandler)
+        self.transcriber = transcriber or BatchTranscriber()
+        self._agent = agent
+        self._processor = processor
+        # Anyone who can reach the port can otherwise parse (and with ?execute=1 run) commands
+        self.token = token if token is not None else os.getenv('SERVER_TOKEN', '')
+        # About five minutes of 16 kHz 16-bit audio by default
+        self.max_body = max_body or int(os.getenv('SERVER_MAX_BODY', 10_000_000))
+        self.started = time.time()
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            from services.nagato_agent import nagato_agent
+            self._agent = nagato_agent
+        return self._agent
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            from services.process_command import CommandProcessor
+            self._processor = CommandProcessor(agent=self.agent)
+        return self._processor
+
+    def transcribe(self, audio):
+        if len(audio) == 0:
+            return ""
+        return self.transcriber.transcribe(audio)["text"].strip().lower()
+
+    def handle_text(self, text, execute=False):
+        """Parse (and with execute, run) a command; returns commands and response"""
+        commands = self.agent.parse_command(text)
+        response = None
+        if execute:
+            response = self.agent.execute_commands(commands)
+            if not response.success and not self.agent.has_action(commands) and not self.agent.single_call:
+                # Same fallback as the UI: answer conversationally when no action fits;
+                # a failed action is reported as such
+                response = NagatoResponse(message=self.processor._get_conversation_response(text))
+        return commands, response
+
+
+class NagatoRequestHandler(BaseHTTPRequestHandler):
+    server_version = "Nagato/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if os.getenv('SERVER_ACCESS_LOG', 'false').lower() == 'true':
+            super().log_message(format, *args)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        """Request body, whole (Content-Length) or streamed (chunked), up to max_body bytes"""
+        limit = self.server.max_body
+        if "chunked" in self.headers.get("Transfer-Encoding", "").lower():
+            parts = []
+            received = 0
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip optional trailers up to the terminating blank line
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return b"".join(parts)
+                received += size
+                if received > limit:
+                    raise RequestTooLarge(f"request body is larger than {limit} bytes")
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get("Content-Length", 0))
+        if length < 0:
+            raise ValueError("invalid Content-Length")
+        if length > limit:
+            raise RequestTooLarge(f"request body is larger than {limit} bytes")
+        return self.rfile.read(length)
+
+    def _authorized(self):
+        """Whether the request carries SERVER_TOKEN (always, when no token is set)"""
+        if not self.server.token:
+            return True
+        expected = f"Bearer {self.server.token}"
+        return hmac.compare_digest(self.headers.get("Authorization", "").encode(), expected.encode())
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if not self._authorized():
+            self._send_json({"error": "missing or invalid token"}, 401)
+            return
+        if path == "/health":
+            self._send_json({
+                "status": "ok",
+                "model": model_manager.state(),
+                "uptime": time.time() - self.server.started,
+            })
+        elif path == "/stats":
+            self._send_json({
+                "batching": self.server.transcriber.stats(),
+                "stages": tracer.summary(),
+            })
+        else:
+            self._send_json({"error": f"unknown endpoint {path}"}, 404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not self._authorized():
+            # The body is left unread, so the connection cannot be reused
+            self.close_connection = True
+            self._send_json({"error": "missing or invalid token"}, 401)
+            return
+        try:
+            body = self._read_body()
+        except RequestTooLarge as e:
+            self.close_connection = True
+            self._send_json({"error": str(e)}, 413)
+            return
+        except ValueError as e:
+            self.close_connection = True
+            self._send_json({"error": str(e)}, 400)
+            return
+
+        routes = {
+            "/transcribe": self._transcribe,
+            "/command": self._command,
+            "/text": self._text,
+        }
+        route = routes.get(url.path)
+        if route is None:
+            self._send_json({"error": f"unknown endpoint {url.path}"}, 404)
+            return
+
+        start = time.perf_counter()
+        try:
+            with tracer.trace("request", path=url.path):
+                payload = route(body, query)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, 400)
+            return
+        except Exception as e:
+            print(f"Error handling {url.path}: {str(e)}")
+            self._send_json({"error": str(e)}, 500)
+            return
+        payload["timings"]["total_ms"] = (time.perf_counter() - start) * 1000
+        self._send_json(payload)
+
+    def _audio(self, body, query):
+        if not body:
+            raise ValueError("request body must contain audio")
+        return decode_audio(body, int(query.get("sample_rate", WHISPER_SAMPLE_RATE)))
+
+    def _transcribe(self, body, query):
+        audio = self._audio(body, query)
+        with tracer.span("stt.transcribe", audio_seconds=len(audio) / WHISPER_SAMPLE_RATE) as span:
+            text = self.server.transcribe(audio)
+        return {"text": text, "timings": {"transcribe_ms": span.duration * 1000}}
+
+    def _command(self, body, query):
+        payload = self._transcribe(body, query)
+        return self._respond(payload["text"], query, payload["timings"])
+
+    def _text(self, body, query):
+        try:
+            text = json.loads(body or b"{}")["text"]
+        except (ValueError, KeyError, TypeError):
+            text = None
+        if not isinstance(text, str):
+            raise ValueError('request body must be JSON like {"text": "open firefox"}')
+        return self._respond(text.strip().lower(), query, {})
+
+    def _respond(self, text, query, timings):
+        if not text:
+            return {"text": text, "commands": [], "response": None, "timings": timings}
+
+        execute = query.get("execute", "0").lower() in ("1", "true")
+        with tracer.span("respond") as span:
+            commands, response = self.server.handle_text(text, execute)
+        timings["respond_ms"] = span.duration * 1000
+        return {
+            "text": text,
+            "commands": [command.model_dump(mode="json") for command in commands],
+            "response": response.model_dump() if response else None,
+            "timings": timings,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv('SERVER_HOST', '127.0.0.1'))
+    parser.add_argument("--port", type=int, default=int(os.getenv('SERVER_PORT', 8765)))
+    args = parser.parse_args()
+
+    # Load the speech model before the first client connects
+    model_manager.preload()
+    server = NagatoServer((args.host, args.port))
+    print(f"Nagato server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.transcriber.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import subprocess
+import threading
+import time
+from typing import List, Optional
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class ActionResult(BaseModel):
+    argv: List[str]
+    returncode: Optional[int] = None  # None while a detached process is still running
+    stdout: str = ""
+    stderr: str = ""
+    duration: float = 0.0  # Seconds
+    timed_out: bool = False
+    error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.error is None and not self.timed_out and self.returncode in (0, None)
+
+    def describe_error(self) -> str:
+        """Short reason for a failed action"""
+        if self.error:
+            return self.error
+        if self.timed_out:
+            return f"timed out after {self.duration:.1f}s"
+        return self.stderr.strip() or f"exit code {self.returncode}"
+
+
+class ActionFailed(RuntimeError):
+    """Raised by ComputerControl when an action did not take effect"""
+
+
+class SubprocessRunner:
+    """Runs commands as argument lists, never through a shell.
+
+    Commands whose output matters use asyncio.create_subprocess_exec with
+    a timeout; detached app launches are plain Popen calls in a new session.
+    """
+
+    def __init__(self, startup_window=0.5):
+        # How long a detached process may take to fail before we call it launched
+        self.startup_window = startup_window
+        self._children = set()  # Popen objects of launched apps still running
+
+    async def run(self, argv, timeout, detach=False):
+        start = time.perf_counter()
+        if detach:
+            return await self._launch(argv, start)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            return ActionResult(argv=argv, duration=time.perf_counter() - start, error=str(e))
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            return ActionResult(argv=argv, duration=time.perf_counter() - start, timed_out=True)
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+
+        return ActionResult(
+            argv=argv,
+            returncode=process.returncode,
+            stdout=stdout.decode(errors="replace"),
+            stderr=stderr.decode(errors="replace"),
+            duration=time.perf_counter() - start
+        )
+
+    async def _launch(self, argv, start):
+        """Start an app in its own session with no pipes to us and give it a moment to fail.
+
+        Only an immediate non-zero exit counts as a failure. Apps still
+        running after the startup window are polled (and so reaped) on later
+        launches instead of being watched by a thread each.
+        """
+        self._prune()
+        try:
+            process = subprocess.Popen(
+                argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except OSError as e:
+            return ActionResult(argv=argv, duration=time.perf_counter() - start, error=str(e))
+
+        deadline = start + self.startup_window
+        while process.poll() is None and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        if process.returncode is None:
+            self._children.add(process)
+        return ActionResult(argv=argv, returncode=process.returncode, duration=time.perf_counter() - start)
+
+    def _prune(self):
+        self._children = {process for process in self._children if process.poll() is None}
+
+    async def _kill(self, process):
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+    @property
+    def running(self):
+        """Detached processes that have not exited yet"""
+        self._prune()
+        return len(self._children)
+
+
+class FakeCommandRunner:
+    """Records commands instead of running them, for headless tests and benchmarks.
+
+    `responses` maps a program name to (returncode, stdout, stderr); unknown
+    programs succeed with no output. Every call takes `delay` seconds.
+    """
+
+    def __init__(self, responses=None, delay=0.0):
+        self.responses = responses or {}
+        self.delay = delay
+        self.calls = []
+        self.running = 0
+
+    async def run(self, argv, timeout, detach=False):
+        start = time.perf_counter()
+        self.calls.append(list(argv))
+        if self.delay > timeout:
+            await asyncio.sleep(timeout)
+            return ActionResult(argv=argv, duration=time.perf_counter() - start, timed_out=True)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        returncode, stdout, stderr = self.responses.get(argv[0], (0, "", ""))
+        return ActionResult(
+            argv=argv,
+            returncode=returncode,
+            stdout=stdout,
+            stderr=stderr,
+            duration=time.perf_counter() - start
+        )
+
+
+class ActionExecutor:
+    """Runs action commands on a private asyncio loop so callers on any thread can wait on them.
+
+    `run()` blocks the calling thread until one command finishes (or times
+    out and is killed); `run_many()` runs several independent commands
+    concurrently. Coroutine callers can await `run_async()` directly.
+    """
+
+    def __init__(self, runner=None, timeout=None):
+        self.runner = runner or self._default_runner()
+        self.timeout = timeout or float(os.getenv('ACTION_TIMEOUT', 10))
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _default_runner(self):
+        if os.getenv('ACTION_BACKEND', 'subprocess') == 'fake':
+            return FakeCommandRunner()
+        return SubprocessRunner()
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="nagato-actions", daemon=True).start()
+            return self._loop
+
+    async def run_async(self, argv, timeout=None, detach=False):
+        return await self.runner.run([str(arg) for arg in argv], timeout or self.timeout, detach)
+
+    def run(self, argv, timeout=None, detach=False) -> ActionResult:
+        """Run one command and wait for its result"""
+        future = asyncio.run_coroutine_threadsafe(self.run_async(argv, timeout, detach), self._get_loop())
+        return future.result()
+
+    def run_many(self, commands, timeout=None) -> List[ActionResult]:
+        """Run independent commands concurrently; results are in the order given"""
+        async def gather():
+            return await asyncio.gather(*(self.run_async(argv, timeout) for argv in commands))
+
+        return asyncio.run_coroutine_threadsafe(gather(), self._get_loop()).result()
+
+# Create singleton instance
+action_executor = ActionExecutor()
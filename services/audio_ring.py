@@ -0,0 +1,92 @@
+import os
+import numpy as np
+from dotenv import load_dotenv
+from services.vad import to_float32
+
+load_dotenv()
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer shared by the microphone and its readers.
+
+    There is a single writer (the audio callback). Readers never lock: they
+    read the monotonically increasing write position and copy only the span
+    they need, so the UI can sample levels every frame without touching the
+    rest of the recording. A reader that falls more than `capacity` samples
+    behind loses the oldest audio.
+    """
+
+    def __init__(self, seconds=30.0, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.capacity = int(seconds * sample_rate)
+        self._buffer = np.zeros(self.capacity, dtype=np.float32)
+        self._written = 0
+
+    @property
+    def position(self):
+        """Total number of samples ever written"""
+        return self._written
+
+    def write(self, block):
+        samples = to_float32(block)
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self._written += n - self.capacity
+            n = self.capacity
+
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[:n - first] = samples[first:]
+        # Publish only after the samples are in place
+        self._written += n
+
+    def _read(self, start, end):
+        n = end - start
+        out = np.empty(n, dtype=np.float32)
+        offset = start % self.capacity
+        first = min(n, self.capacity - offset)
+        out[:first] = self._buffer[offset:offset + first]
+        out[first:] = self._buffer[:n - first]
+        return out
+
+    def read_since(self, position):
+        """Return (samples written after position, new position)"""
+        end = self._written
+        start = max(position, end - self.capacity)
+        if start >= end:
+            return np.zeros(0, dtype=np.float32), end
+        return self._read(start, end), end
+
+    def read_latest(self, n):
+        """Return up to the n most recent samples"""
+        end = self._written
+        start = max(0, end - min(n, self.capacity))
+        return self._read(start, end)
+
+    def rms(self, n=512):
+        """RMS level of the most recent n samples"""
+        samples = self.read_latest(n)
+        if len(samples) == 0:
+            return 0.0
+        return float(np.sqrt(np.mean(samples * samples)))
+
+    def band_levels(self, bands=4, n=512, floor_db=-60.0):
+        """Levels (0-1) of the most recent n samples in log-spaced frequency bands"""
+        samples = self.read_latest(n)
+        if len(samples) < n:
+            return np.zeros(bands)
+
+        spectrum = np.abs(np.fft.rfft(samples * np.hanning(n))) / (n / 4)
+        # Speech sits roughly between 100 Hz and 4 kHz
+        freqs = np.fft.rfftfreq(n, 1.0 / self.sample_rate)
+        edges = np.geomspace(100, min(4000, self.sample_rate / 2), bands + 1)
+        levels = np.empty(bands)
+        for i in range(bands):
+            mask = (freqs >= edges[i]) & (freqs < edges[i + 1])
+            power = spectrum[mask].max() if mask.any() else 0.0
+            levels[i] = 20 * np.log10(power + 1e-9)
+        return np.clip((levels - floor_db) / -floor_db, 0.0, 1.0)
+
+# Shared buffer the microphone capture writes into
+microphone_buffer = AudioRingBuffer(sample_rate=int(os.getenv('SAMPLE_RATE', 16000)))
@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from services.model_manager import model_manager
+from services.tracing import tracer
+
+load_dotenv()
+
+class BatchTranscriber:
+    """Transcribes clips from many callers with dynamic batching.
+
+    Requests queue up while the model is busy; the decode thread takes the
+    first one and then waits at most `max_wait` seconds for more, up to
+    `max_batch` clips, and sends them through the backend's
+    transcribe_batch() as one forward pass. A lone request therefore pays
+    at most `max_wait` of extra latency, while under load the batches fill
+    up on their own.
+    """
+
+    def __init__(self, backend=None, max_batch=None, max_wait=None, history=200):
+        self._backend = backend
+        self.max_batch = max_batch or int(os.getenv('BATCH_MAX_SIZE', 8))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv('BATCH_MAX_WAIT', 0.05))
+        self._requests = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.completed = 0
+        self.batches = 0
+        self.batch_sizes = deque(maxlen=history)
+        self.decode_times = deque(maxlen=history)
+
+    @property
+    def backend(self):
+        # The shared model (WHISPER_MODEL / STT_BACKEND) unless one was injected
+        if self._backend is None:
+            self._backend = model_manager.get()
+        return self._backend
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nagato-batch-stt", daemon=True)
+                self._thread.start()
+
+    def submit(self, audio) -> Future:
+        """Queue float32 16 kHz audio; returns a Future resolving to the whisper-style result"""
+        self.start()
+        future = Future()
+        self._requests.put((audio, future, time.perf_counter()))
+        return future
+
+    def transcribe(self, audio, timeout=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(audio).result(timeout)
+
+    @property
+    def queue_depth(self):
+        return self._requests.qsize()
+
+    def _collect(self, first):
+        """Gather more requests until the batch is full or max_wait has passed"""
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued
+                if remaining > 0:
+                    item = self._requests.get(timeout=remaining)
+                else:
+                    item = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)  # Let shutdown() stop the loop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._requests.get()
+            if first is None:
+                break
+            batch = [item for item in self._collect(first) if item[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                with tracer.span("stt.batch", size=len(batch),
+                                 queue_wait_ms=round((start - batch[0][2]) * 1000, 3)):
+                    results = self.backend.transcribe_batch([audio for audio, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+            finally:
+                with self._lock:
+                    self.completed += len(batch)
+                    self.batches += 1
+                    self.batch_sizes.append(len(batch))
+                    self.decode_times.append(time.perf_counter() - start)
+
+    def stats(self):
+        """Request and batch counts, mean/max batch size and mean decode time"""
+        with self._lock:
+            sizes = list(self.batch_sizes)
+            decodes = list(self.decode_times)
+            return {
+                "queue_depth": self.queue_depth,
+                "completed": self.completed,
+                "batches": self.batches,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000,
+                "mean_batch_size": sum(sizes) / len(sizes) if sizes else 0.0,
+                "largest_batch": max(sizes, default=0),
+                "mean_decode_ms": sum(decodes) / len(decodes) * 1000 if decodes else 0.0,
+            }
+
+    def shutdown(self):
+        self._requests.put(None)
@@ -0,0 +1,171 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Union
+from services.commands import CommandType, Command
+from services.intent_matcher import normalize_text
+
+# Commands relative to the current state ("louder", "a bit more") must always be re-parsed
+RELATIVE_TERMS = re.compile(
+    r"\b(louder|quieter|softer|lower|higher|raise|increase|decrease|up|down|more|less|"
+    r"bit|little|again|back)\b"
+)
+
+
+def trigram_vector(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def cosine_similarity(a: Counter, b: Counter) -> float:
+    dot = sum(count * b[gram] for gram, count in a.items() if gram in b)
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(count * count for count in a.values()))
+    norm_b = math.sqrt(sum(count * count for count in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+class CommandCache:
+    """Persistent LRU cache from normalized transcripts to parsed command lists.
+
+    Backed by SQLite, bounded to `max_entries` rows and `ttl` seconds. When
+    `similarity` is above zero, a miss falls back to the closest cached
+    transcript by character-trigram cosine similarity, restricted to entries
+    containing exactly the same numbers ("volume 30" never matches "volume 80").
+    """
+
+    def __init__(self, path=None, max_entries=None, ttl=None, similarity=None):
+        self.path = path or os.getenv('COMMAND_CACHE_PATH', 'temp/command_cache.db')
+        self.max_entries = max_entries or int(os.getenv('COMMAND_CACHE_SIZE', 500))
+        self.ttl = ttl if ttl is not None else float(os.getenv('COMMAND_CACHE_TTL', 7 * 24 * 3600))
+        self.similarity = similarity if similarity is not None else float(
+            os.getenv('COMMAND_CACHE_SIMILARITY', 0.9)
+        )
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS commands (
+                key TEXT PRIMARY KEY,
+                numbers TEXT NOT NULL,
+                command TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS commands_last_used ON commands (last_used)")
+        self._db.commit()
+
+    def key(self, text: str) -> str:
+        return normalize_text(text)
+
+    def is_cacheable(self, key: str) -> bool:
+        return bool(key) and not RELATIVE_TERMS.search(key)
+
+    def _numbers(self, key: str) -> str:
+        return " ".join(re.findall(r"\d+", key))
+
+    def get(self, text: str) -> Optional[List[Command]]:
+        """Return the cached commands for text, or None on a miss"""
+        key = self.key(text)
+        if not self.is_cacheable(key):
+            self.bypassed += 1
+            return None
+
+        now = time.time()
+        with self._lock:
+            self._db.execute("DELETE FROM commands WHERE created_at < ?", (now - self.ttl,))
+            row = self._db.execute(
+                "SELECT key, command FROM commands WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None and self.similarity > 0:
+                row = self._closest(key)
+                if row is not None:
+                    self.similar_hits += 1
+
+            if row is None:
+                self.misses += 1
+                self._db.commit()
+                return None
+
+            self._db.execute("UPDATE commands SET last_used = ? WHERE key = ?", (now, row[0]))
+            self._db.commit()
+
+        self.hits += 1
+        stored = json.loads(row[1])
+        # Rows written before multi-action commands hold a single command
+        if isinstance(stored, dict):
+            stored = [stored]
+        commands = [Command.model_validate(item) for item in stored]
+        for command in commands:
+            command.source = "cache"
+        return commands
+
+    def _closest(self, key: str):
+        vector = trigram_vector(key)
+        best, best_score = None, self.similarity
+        rows = self._db.execute(
+            "SELECT key, command FROM commands WHERE numbers = ?", (self._numbers(key),)
+        )
+        for row in rows:
+            score = cosine_similarity(vector, trigram_vector(row[0]))
+            if score >= best_score:
+                best, best_score = row, score
+        return best
+
+    def put(self, text: str, commands: Union[Command, List[Command]]):
+        """Store action commands; conversation and relative commands are skipped"""
+        if isinstance(commands, Command):
+            commands = [commands]
+        key = self.key(text)
+        if not commands or not self.is_cacheable(key) or \
+                any(command.type == CommandType.CONVERSATION for command in commands):
+            return
+        stored = json.dumps([command.model_dump(mode="json") for command in commands])
+
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO commands (key, numbers, command, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self._numbers(key), stored, now, now)
+            )
+            # Evict least recently used rows beyond the size bound
+            self._db.execute(
+                "DELETE FROM commands WHERE key IN ("
+                "SELECT key FROM commands ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM commands")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM commands").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+class CommandType(Enum):
+    OPEN_APP = "open_app"
+    VOLUME = "volume"
+    SCREENSHOT = "screenshot"
+    CONVERSATION = "conversation"
+
+class Command(BaseModel):
+    type: CommandType
+    content: dict
+    # Which parser produced the command: "local", "cache" or "llm"
+    source: str = "llm"
+
+class NagatoResponse(BaseModel):
+    message: str
+    action_taken: Optional[str] = None
+    success: bool = True
+
+    def to_text(self) -> str:
+        """Text shown to the user for this response"""
+        if self.action_taken:
+            return f"{self.message}\n{self.action_taken}"
+        return self.message
@@ -1,58 +1,87 @@
 import os
-import subprocess
 import time
 from typing import Optional
 from pydantic import BaseModel, Field
+from services.tracing import traced
+from services.action_executor import ActionFailed, action_executor
+from services.desktop_backends import create_desktop_backend
+from services.commands import CommandType
+from services.tool_registry import tool_registry
+
+# Request models for the actions; each one is registered as an LLM tool below
+class OpenAppRequest(BaseModel):
+    app_name: str = Field(..., description="Application name")
+
+class VolumeRequest(BaseModel):
+    level: int = Field(..., description="Volume level", ge=0, le=100)
+
+class ScreenshotRequest(BaseModel):
+    filename: Optional[str] = Field(None, description="Output filename")
 
 class ComputerControl:
+    def __init__(self, executor=None, backend=None):
+        # Commands run without a shell; the executor enforces timeouts and reaps children
+        self.executor = executor or action_executor
+        # The platform is detected once here rather than on every action
+        self.backend = backend or create_desktop_backend(self.executor)
+
+    @tool_registry.register(
+        "open_application", OpenAppRequest, CommandType.OPEN_APP,
+        description="Open an application",
+        message="Sure! {result}",
+        action_taken="Opened {app_name}"
+    )
+    @traced("action.open_application")
     def open_application(self, app_name: str) -> str:
-        """Open an application"""
+        """Open an application; raises ActionFailed if it could not be launched"""
         try:
-            if os.name == 'posix':  # macOS/Linux
-                subprocess.Popen(['open', '-a', app_name])
-                return f"Opened {app_name}"
-            elif os.name == 'nt':  # Windows
-                subprocess.Popen(app_name)
-                return f"Opened {app_name}"
-        except Exception as e:
-            return f"Failed to open {app_name}: {str(e)}"
+            result = self.backend.open_application(app_name)
+        except NotImplementedError:
+            raise ActionFailed("Opening applications is not implemented for this OS")
+        if not result.success:
+            raise ActionFailed(f"Failed to open {app_name}: {result.describe_error()}")
+        return f"Opened {app_name}"
 
+    @tool_registry.register(
+        "adjust_volume", VolumeRequest, CommandType.VOLUME,
+        description="Set the system volume",
+        message="Alright, {result}",
+        action_taken="Adjusted volume to {level}%"
+    )
+    @traced("action.adjust_volume")
     def adjust_volume(self, level: int) -> str:
-        """Adjust system volume (0-100)"""
+        """Adjust system volume (0-100); raises ActionFailed if it could not be set"""
+        level = max(0, min(100, int(level)))
         try:
-            if os.name == 'posix':  # macOS
-                level = max(0, min(100, level))
-                os.system(f"osascript -e 'set volume output volume {level}'")
-                return f"Volume set to {level}%"
-            # Add Windows implementation if needed
-            return "Volume control not implemented for this OS"
-        except Exception as e:
-            return f"Failed to adjust volume: {str(e)}"
+            result = self.backend.set_volume(level)
+        except NotImplementedError:
+            raise ActionFailed("Volume control not implemented for this OS")
+        if not result.success:
+            raise ActionFailed(f"Failed to adjust volume: {result.describe_error()}")
+        return f"Volume set to {level}%"
 
+    @tool_registry.register(
+        "take_screenshot", ScreenshotRequest, CommandType.SCREENSHOT,
+        description="Take a screenshot",
+        message="Done! {result}",
+        action_taken="Took screenshot"
+    )
+    @traced("action.take_screenshot")
     def take_screenshot(self, filename: Optional[str] = None) -> str:
-        """Take a screenshot"""
-        try:
-            if filename is None:
-                # Create screenshots directory if it doesn't exist
-                os.makedirs("screenshots", exist_ok=True)
-                filename = f"screenshots/screenshot_{int(time.time())}.png"
-            
-            if os.name == 'posix':  # macOS
-                os.system(f"screencapture '{filename}'")
-                return f"Screenshot saved as {filename}"
-            elif os.name == 'nt':  # Windows
-                # Add Windows implementation using pyautogui or similar
-                return "Screenshot not implemented for Windows yet"
-            return "Screenshot not implemented for this OS"
-        except Exception as e:
-            return f"Failed to take screenshot: {str(e)}"
-
-# Create tools using Pydantic models
-class OpenAppRequest(BaseModel):
-    app_name: str = Field(..., description="Name of the application to open")
-
-class VolumeRequest(BaseModel):
-    level: int = Field(..., description="Volume level (0-100)", ge=0, le=100)
+        """Take a screenshot into screenshots/; raises ActionFailed if it could not be saved"""
+        if filename is None:
+            filename = f"screenshot_{int(time.time())}.png"
+        # The name may come from the LLM or a remote client: never write outside screenshots/
+        if not filename or os.path.basename(filename) != filename or filename in (".", ".."):
+            raise ActionFailed(f"Screenshot filename must be a plain file name, not {filename!r}")
+        # Create screenshots directory if it doesn't exist
+        os.makedirs("screenshots", exist_ok=True)
+        filename = os.path.join("screenshots", filename)
 
-class ScreenshotRequest(BaseModel):
-    filename: Optional[str] = Field(None, description="Optional filename for the screenshot") 
\ No newline at end of file
+        try:
+            result = self.backend.take_screenshot(filename)
+        except NotImplementedError:
+            raise ActionFailed("Screenshot not implemented for this OS")
+        if not result.success:
+            raise ActionFailed(f"Failed to take screenshot: {result.describe_error()}")
+        return f"Screenshot saved as {filename}"
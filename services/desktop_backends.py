@@ -0,0 +1,240 @@
+import configparser
+import glob
+import os
+import platform
+import shlex
+import shutil
+import struct
+import threading
+import time
+import zlib
+from difflib import get_close_matches
+import numpy as np
+from dotenv import load_dotenv
+from services.action_executor import ActionResult
+
+load_dotenv()
+
+# Desktop entry Exec field codes (%f, %U, ...) that are filled in by launchers
+FIELD_CODES = {"%f", "%F", "%u", "%U", "%d", "%D", "%n", "%N", "%i", "%c", "%k", "%v", "%m"}
+
+
+def encode_png(rgb, compress_level=1):
+    """Encode an HxWx3 uint8 array as PNG bytes.
+
+    Level 1 zlib with no row filtering is several times faster than the
+    default and still shrinks typical desktop screenshots well.
+    """
+    height, width, _ = rgb.shape
+    # Each scanline starts with its filter type byte (0 = none)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xffffffff)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level))
+            + chunk(b"IEND", b""))
+
+
+def save_image(rgb, filename):
+    """Write a screenshot as PNG, or as raw PPM (no compression at all) for .ppm files"""
+    with open(filename, "wb") as f:
+        if filename.lower().endswith(".ppm"):
+            height, width, _ = rgb.shape
+            f.write(f"P6 {width} {height} 255\n".encode())
+            f.write(np.ascontiguousarray(rgb).tobytes())
+        else:
+            f.write(encode_png(rgb))
+
+
+class DesktopEntryIndex:
+    """Installed applications from freedesktop .desktop files, looked up by name"""
+
+    def __init__(self, directories=None):
+        self.directories = directories or self._default_directories()
+        self.entries = {}  # lower-case name -> argv
+        self.refresh()
+
+    def _default_directories(self):
+        data_home = os.getenv('XDG_DATA_HOME', os.path.expanduser('~/.local/share'))
+        data_dirs = os.getenv('XDG_DATA_DIRS', '/usr/local/share:/usr/share').split(':')
+        directories = [os.path.join(path, 'applications') for path in [data_home] + data_dirs]
+        directories.append('/var/lib/flatpak/exports/share/applications')
+        return directories
+
+    def refresh(self):
+        entries = {}
+        # Earlier directories take precedence, as in the XDG spec
+        for directory in reversed(self.directories):
+            for path in glob.glob(os.path.join(directory, "**", "*.desktop"), recursive=True):
+                entry = self._parse(path)
+                if entry is None:
+                    continue
+                names, argv = entry
+                for name in names:
+                    entries[name.lower()] = argv
+        self.entries = entries
+
+    def _parse(self, path):
+        parser = configparser.RawConfigParser(interpolation=None, strict=False)
+        parser.optionxform = str
+        try:
+            parser.read(path, encoding="utf-8")
+            entry = parser["Desktop Entry"]
+        except (configparser.Error, KeyError, UnicodeDecodeError):
+            return None
+        if entry.get("Type", "Application") != "Application" or \
+                entry.get("NoDisplay") == "true" or entry.get("Hidden") == "true" or "Exec" not in entry:
+            return None
+
+        try:
+            argv = [arg for arg in shlex.split(entry["Exec"]) if arg not in FIELD_CODES]
+        except ValueError:
+            return None
+        if not argv:
+            return None
+
+        names = [entry.get("Name", ""), os.path.splitext(os.path.basename(path))[0], os.path.basename(argv[0])]
+        names += [name for key, name in entry.items() if key.startswith("GenericName")]
+        return [name for name in names if name], argv
+
+    def find(self, app_name):
+        """argv to launch an app by (approximate) name, or None"""
+        key = app_name.strip().lower()
+        if key in self.entries:
+            return self.entries[key]
+        close = get_close_matches(key, list(self.entries), n=1, cutoff=0.75)
+        if close:
+            return self.entries[close[0]]
+        # "chrome" should find "Google Chrome"
+        for name, argv in self.entries.items():
+            if key in name.split():
+                return argv
+        return None
+
+
+class DesktopBackend:
+    """Platform-specific implementations of the computer actions"""
+
+    name = "unsupported"
+
+    def __init__(self, executor):
+        self.executor = executor
+
+    def open_application(self, app_name: str) -> ActionResult:
+        raise NotImplementedError
+
+    def set_volume(self, level: int) -> ActionResult:
+        raise NotImplementedError
+
+    def take_screenshot(self, filename: str) -> ActionResult:
+        raise NotImplementedError
+
+
+class MacOSBackend(DesktopBackend):
+    name = "macos"
+
+    def open_application(self, app_name):
+        return self.executor.run(['open', '-a', app_name], detach=True)
+
+    def set_volume(self, level):
+        return self.executor.run(['osascript', '-e', f'set volume output volume {level}'])
+
+    def take_screenshot(self, filename):
+        return self.executor.run(['screencapture', filename])
+
+
+class WindowsBackend(DesktopBackend):
+    name = "windows"
+
+    def open_application(self, app_name):
+        return self.executor.run([app_name], detach=True)
+
+
+class LinuxBackend(DesktopBackend):
+    """Desktop-entry app launching, PulseAudio/ALSA volume and in-process X11 screenshots"""
+
+    name = "linux"
+
+    def __init__(self, executor, index=None):
+        super().__init__(executor)
+        self._index = index
+        self._display = None
+        self._display_lock = threading.Lock()
+        # Prefer PulseAudio (also provided by PipeWire), fall back to ALSA
+        if shutil.which('pactl'):
+            self.mixer = 'pactl'
+        elif shutil.which('amixer'):
+            self.mixer = 'amixer'
+        else:
+            self.mixer = None
+
+    @property
+    def index(self):
+        # Scanning .desktop files is deferred to the first launch
+        if self._index is None:
+            self._index = DesktopEntryIndex()
+        return self._index
+
+    def open_application(self, app_name):
+        # Only installed desktop apps are launched; a name from the LLM is never run as a command
+        argv = self.index.find(app_name)
+        if argv is None:
+            return ActionResult(argv=[app_name], error=f"no installed application matches '{app_name}'")
+        return self.executor.run(argv, detach=True)
+
+    def set_volume(self, level):
+        if self.mixer == 'pactl':
+            return self.executor.run(['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{level}%'])
+        if self.mixer == 'amixer':
+            return self.executor.run(['amixer', '-q', 'sset', 'Master', f'{level}%'])
+        return ActionResult(argv=[], error="neither pactl nor amixer is installed")
+
+    def capture_screen(self):
+        """Grab the whole X screen into an HxWx3 uint8 RGB array"""
+        from Xlib import X, display
+
+        with self._display_lock:
+            if self._display is None:
+                self._display = display.Display()
+            root = self._display.screen().root
+            geometry = root.get_geometry()
+            image = root.get_image(0, 0, geometry.width, geometry.height, X.ZPixmap, 0xffffffff)
+
+        # 24/32-bit visuals come back as BGRX rows
+        pixels = np.frombuffer(image.data, dtype=np.uint8)
+        stride = len(pixels) // geometry.height
+        rows = pixels.reshape(geometry.height, stride)[:, :geometry.width * 4]
+        return rows.reshape(geometry.height, geometry.width, 4)[:, :, 2::-1]
+
+    def take_screenshot(self, filename):
+        start = time.perf_counter()
+        try:
+            save_image(self.capture_screen(), filename)
+        except Exception as e:
+            with self._display_lock:
+                self._display = None  # Reconnect next time
+            return ActionResult(argv=['xlib', filename], duration=time.perf_counter() - start, error=str(e))
+        return ActionResult(argv=['xlib', filename], returncode=0, duration=time.perf_counter() - start)
+
+
+BACKENDS = {
+    "macos": MacOSBackend,
+    "linux": LinuxBackend,
+    "windows": WindowsBackend,
+}
+
+
+def create_desktop_backend(executor, name=None):
+    """Pick the backend for this platform once (DESKTOP_BACKEND overrides detection)"""
+    name = name or os.getenv('DESKTOP_BACKEND') or {
+        "Darwin": "macos",
+        "Linux": "linux",
+        "Windows": "windows",
+    }.get(platform.system())
+    backend = BACKENDS.get(name, DesktopBackend)
+    return backend(executor)
@@ -0,0 +1,282 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+# Taken from computer_control so that its actions are registered before the names are read
+from services.computer_control import tool_registry
+from services.intent_matcher import IntentMatcher
+
+# Function calls the fake model answers with, per command type
+FUNCTION_NAMES = {tool.command_type: tool.name for tool in tool_registry}
+
+
+# Where one spoken request chains several actions
+CLAUSE_SEPARATORS = re.compile(r",|;|\b(?:and then|and|then)\b")
+
+
+def _user_message(kwargs):
+    for message in reversed(kwargs.get("messages", [])):
+        if message["role"] == "user":
+            return message["content"]
+    return ""
+
+
+def _system_message(kwargs):
+    for message in kwargs.get("messages", []):
+        if message["role"] == "system":
+            return message["content"]
+    return ""
+
+
+def replay_key(model, system, text):
+    """What a recorded exchange is looked up by: the same text asked of another
+    model or under another prompt (parse or conversation) is a different exchange"""
+    return model, " ".join(system.split()), text.strip().lower()
+
+
+def estimate_tokens(kwargs):
+    """Rough prompt size (about four characters per token) of a request"""
+    payload = json.dumps(kwargs.get("messages", [])) + json.dumps(kwargs.get("tools", []))
+    return len(payload) // 4
+
+
+def _chunks(text, size=4):
+    """Split a reply into small pieces, roughly like streamed tokens"""
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class _Stream:
+    """Iterator of completion chunks with the close() of an OpenAI stream"""
+
+    def __init__(self, chunks, token_latency):
+        self._chunks = iter(chunks)
+        self.token_latency = token_latency
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.closed:
+            raise StopIteration
+        chunk = next(self._chunks)
+        if self.token_latency:
+            time.sleep(self.token_latency)
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeLLMClient:
+    """Offline stand-in for the OpenAI client used by the agent and processor.
+
+    Implements just `chat.completions.create(**kwargs)`, with and without
+    `stream=True`, returning objects shaped like the OpenAI SDK's. Replies
+    come from `responder(text)`, which returns {"tool_calls": [{"name",
+    "arguments"}, ...]} or {"content": ...}. By default each clause of the
+    text ("open Firefox and set volume to 30") is run through the local
+    intent matcher with no confidence threshold, giving one tool call per
+    recognised action. `latency` (seconds before the first token, +/-
+    `jitter`) and `token_latency` (per streamed chunk) simulate the network
+    and the model.
+    """
+
+    def __init__(self, latency=None, token_latency=None, jitter=0.0, responder=None, seed=None):
+        self.latency = latency if latency is not None else float(os.getenv('LLM_FAKE_LATENCY', 0.3))
+        self.token_latency = token_latency if token_latency is not None else float(
+            os.getenv('LLM_FAKE_TOKEN_LATENCY', 0.01)
+        )
+        self.jitter = jitter
+        self.responder = responder or self.default_response
+        self.matcher = IntentMatcher(threshold=0.0)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def default_response(self, text):
+        calls = []
+        for clause in CLAUSE_SEPARATORS.split(text):
+            command, _ = self.matcher.match(clause)
+            if command is not None and command.type in FUNCTION_NAMES:
+                calls.append({
+                    "name": FUNCTION_NAMES[command.type],
+                    "arguments": json.dumps(command.content),
+                })
+        if calls:
+            return {"tool_calls": calls}
+        return {"content": f"Sure, happy to help with \"{text}\"."}
+
+    def _wait(self):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _reply(self, kwargs):
+        return self.responder(_user_message(kwargs))
+
+    def create(self, stream=False, **kwargs):
+        reply = self._reply(kwargs)
+        usage = SimpleNamespace(prompt_tokens=estimate_tokens(kwargs))
+        self._wait()
+        if stream:
+            chunks = self._stream_chunks(reply)
+            if kwargs.get("stream_options", {}).get("include_usage"):
+                # As with the API, usage arrives in a final chunk without choices
+                chunks.append(SimpleNamespace(choices=[], usage=usage))
+            return _Stream(chunks, self.token_latency)
+        response = self._completion(reply)
+        response.usage = usage
+        return response
+
+    def _tool_calls(self, reply):
+        calls = reply.get("tool_calls") or []
+        # Recordings from the older functions API hold a single function_call
+        if "function_call" in reply:
+            calls = [reply["function_call"]]
+        return calls
+
+    def _completion(self, reply):
+        tool_calls = [
+            SimpleNamespace(id=f"call_{i}", type="function",
+                            function=SimpleNamespace(name=call["name"], arguments=call["arguments"]))
+            for i, call in enumerate(self._tool_calls(reply))
+        ] or None
+        message = SimpleNamespace(content=reply.get("content"), tool_calls=tool_calls, role="assistant")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    def _stream_chunks(self, reply):
+        def chunk(content=None, tool_call=None):
+            delta = SimpleNamespace(content=content, tool_calls=[tool_call] if tool_call else None, role=None)
+            return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)], usage=None)
+
+        calls = self._tool_calls(reply)
+        if calls:
+            chunks = []
+            for index, call in enumerate(calls):
+                # Like the API: the first delta of a call carries its id and name
+                for n, piece in enumerate(_chunks(call["arguments"])):
+                    function = SimpleNamespace(name=call["name"] if n == 0 else None, arguments=piece)
+                    chunks.append(chunk(tool_call=SimpleNamespace(
+                        index=index, id=f"call_{index}" if n == 0 else None, type="function", function=function
+                    )))
+            return chunks
+        return [chunk(content=piece) for piece in _chunks(reply.get("content") or "")]
+
+
+class ReplayLLMClient(FakeLLMClient):
+    """Answers with responses recorded from the real API (see RecordingLLMClient).
+
+    The recording is JSON lines of {"model": ..., "system": ..., "text": ...,
+    "response": {...}} with the response in the responder format above, and
+    a request is answered from the line with the same model, system prompt
+    and user message. Requests that were never recorded fall back to the
+    fake responder.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path or os.getenv('LLM_REPLAY_PATH', 'benchmarks/data/llm_replay.jsonl')
+        self.recorded = {}
+        self.misses = 0
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        key = replay_key(item.get("model"), item.get("system", ""), item["text"])
+                        self.recorded[key] = item["response"]
+
+    def _reply(self, kwargs):
+        text = _user_message(kwargs)
+        response = self.recorded.get(replay_key(kwargs.get("model"), _system_message(kwargs), text))
+        if response is None:
+            self.misses += 1
+            return self.responder(text)
+        return response
+
+
+class _RecordedStream:
+    """Passes a real stream through, collecting its deltas into one response"""
+
+    def __init__(self, stream, on_complete):
+        self._stream = stream
+        self._chunks = iter(stream)
+        self._on_complete = on_complete
+        self._content = []
+        self._calls = {}  # Tool call index -> {"name", "arguments"}
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            if self._calls:
+                self._on_complete({"tool_calls": [self._calls[index] for index in sorted(self._calls)]})
+            else:
+                self._on_complete({"content": "".join(self._content)})
+            raise
+        delta = chunk.choices[0].delta if chunk.choices else None
+        if delta is not None:
+            if delta.content:
+                self._content.append(delta.content)
+            for call in delta.tool_calls or []:
+                recorded = self._calls.setdefault(call.index, {"name": "", "arguments": ""})
+                if call.function.name:
+                    recorded["name"] = call.function.name
+                recorded["arguments"] += call.function.arguments or ""
+        return chunk
+
+    def close(self):
+        # A stream closed early (e.g. cancelled) is incomplete and not recorded
+        self._stream.close()
+
+
+class RecordingLLMClient:
+    """Wraps a real client and appends each exchange, streamed or not, to a replay file.
+
+    Used with LLM_CLIENT=record: talk to Nagato as usual and the recording
+    can then be replayed offline with LLM_CLIENT=replay.
+    """
+
+    def __init__(self, client, path=None):
+        self.client = client
+        self.path = path or os.getenv('LLM_REPLAY_PATH', 'benchmarks/data/llm_replay.jsonl')
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            return _RecordedStream(response, lambda recorded: self._write(kwargs, recorded))
+
+        message = response.choices[0].message
+        if message.tool_calls:
+            recorded = {"tool_calls": [
+                {"name": call.function.name, "arguments": call.function.arguments}
+                for call in message.tool_calls
+            ]}
+        else:
+            recorded = {"content": message.content}
+        self._write(kwargs, recorded)
+        return response
+
+    def _write(self, kwargs, recorded):
+        item = {
+            "model": kwargs.get("model"),
+            "system": _system_message(kwargs),
+            "text": _user_message(kwargs),
+            "response": recorded,
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(item) + "\n")
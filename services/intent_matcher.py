@@ -0,0 +1,127 @@
+import os
+import re
+from difflib import SequenceMatcher
+from typing import Optional, Tuple
+from services.commands import CommandType, Command
+
+# Applications the matcher resolves without the LLM; extend with KNOWN_APPS in .env
+DEFAULT_APPS = [
+    "Safari", "Google Chrome", "Firefox", "Terminal", "Finder", "Spotify", "Slack",
+    "Visual Studio Code", "Notes", "Calendar", "Mail", "Messages", "Music", "Photos",
+    "Calculator", "System Settings", "Zoom", "Discord", "Microsoft Word",
+    "Microsoft Excel", "Preview", "TextEdit"
+]
+
+# Spoken names that differ from the application name
+APP_ALIASES = {
+    "chrome": "Google Chrome",
+    "google": "Google Chrome",
+    "vs code": "Visual Studio Code",
+    "vscode": "Visual Studio Code",
+    "code": "Visual Studio Code",
+    "settings": "System Settings",
+    "system preferences": "System Settings",
+    "word": "Microsoft Word",
+    "excel": "Microsoft Excel",
+    "itunes": "Music",
+}
+
+NUMBER_WORDS = {
+    "zero": 0, "ten": 10, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90, "hundred": 100,
+    "a hundred": 100, "one hundred": 100,
+}
+
+FILLER = re.compile(
+    r"^(hey |hi |ok |okay )?(nagato[, ]*)?(please |can you |could you |would you |i want you to )*"
+    r"|( for me)?( please)?( now)?$"
+)
+
+SCREENSHOT = re.compile(
+    r"^(take|grab|capture|make|snap)( me)?( a| an| the)? ?(quick )?"
+    r"(screenshot|screen shot|screen capture|screen grab|picture of (the|my) screen)"
+    r"( of (the|my) (screen|desktop))?$"
+    r"|^screenshot$"
+)
+
+VOLUME_LEVEL = re.compile(
+    r"^((set|turn|change|put|adjust)( the)? (volume|sound)( level)?( up| down)?( to| at)?"
+    r"|(volume|sound)( level)?( to| at)?"
+    r"|(set|turn|change|put|adjust)( the)? (volume|sound)( level)?)"
+    r" (?P<level>\d{1,3}|" + "|".join(NUMBER_WORDS) + r")( percent| %|%)?$"
+)
+
+MUTE = re.compile(r"^(mute|silence)( the)?( volume| sound| audio| computer)?$|^(volume|sound) (off|zero)$")
+MAX_VOLUME = re.compile(r"^(max|maximum|full)( the)? (volume|sound)$|^(volume|sound) (max|maximum|all the way up)$")
+
+OPEN_APP = re.compile(
+    r"^(open|launch|start|run|fire up|bring up)( up)?( the| my)? (?P<app>.+?)"
+    r"( app| application| browser| program)?$"
+)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and polite filler so equivalent phrasings compare equal"""
+    text = text.lower().replace("%", " percent")
+    text = re.sub(r"[^a-z0-9' ]+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return FILLER.sub("", text).strip()
+
+
+class IntentMatcher:
+    """Deterministic keyword/regex grammar for commands that do not need the LLM"""
+
+    def __init__(self, apps=None, threshold=None):
+        extra = [app.strip() for app in os.getenv('KNOWN_APPS', '').split(',') if app.strip()]
+        self.apps = list(apps or DEFAULT_APPS) + extra
+        self.threshold = threshold if threshold is not None else float(
+            os.getenv('LOCAL_INTENT_THRESHOLD', 0.85)
+        )
+        self._app_index = {app.lower(): app for app in self.apps}
+        self._app_index.update(APP_ALIASES)
+
+    def match(self, text: str) -> Tuple[Optional[Command], float]:
+        """Return the best local command and its confidence, or (None, 0.0)"""
+        text = normalize_text(text)
+        if not text:
+            return None, 0.0
+
+        if SCREENSHOT.match(text):
+            return self._command(CommandType.SCREENSHOT, {"filename": None}), 1.0
+
+        if MUTE.match(text):
+            return self._command(CommandType.VOLUME, {"level": 0}), 1.0
+        if MAX_VOLUME.match(text):
+            return self._command(CommandType.VOLUME, {"level": 100}), 1.0
+
+        volume = VOLUME_LEVEL.match(text)
+        if volume:
+            level = volume.group("level")
+            level = int(level) if level.isdigit() else NUMBER_WORDS[level]
+            if 0 <= level <= 100:
+                return self._command(CommandType.VOLUME, {"level": level}), 1.0
+            return None, 0.0
+
+        open_app = OPEN_APP.match(text)
+        if open_app:
+            app, confidence = self.match_app(open_app.group("app"))
+            if app:
+                return self._command(CommandType.OPEN_APP, {"app_name": app}), confidence
+
+        return None, 0.0
+
+    def match_app(self, spoken: str) -> Tuple[Optional[str], float]:
+        """Fuzzy-match a spoken application name against the known apps"""
+        spoken = spoken.strip()
+        if spoken in self._app_index:
+            return self._app_index[spoken], 1.0
+
+        best, best_score = None, 0.0
+        for name, app in self._app_index.items():
+            score = SequenceMatcher(None, spoken, name).ratio()
+            if score > best_score:
+                best, best_score = app, score
+        return best, best_score
+
+    def _command(self, command_type: CommandType, content: dict) -> Command:
+        return Command(type=command_type, content=content, source="local")
@@ -0,0 +1,42 @@
+import os
+import threading
+from openai import OpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_client = None
+_lock = threading.Lock()
+
+def create_llm_client(kind=None):
+    """Create an LLM client: "openai", "record" (OpenAI, saving each exchange for
+    replay) or the offline "fake" and "replay" stand-ins"""
+    kind = kind or os.getenv('LLM_CLIENT', 'openai')
+    if kind == 'fake':
+        from services.fake_llm import FakeLLMClient
+        return FakeLLMClient()
+    if kind == 'replay':
+        from services.fake_llm import ReplayLLMClient
+        return ReplayLLMClient()
+    if kind == 'record':
+        from services.fake_llm import RecordingLLMClient
+        return RecordingLLMClient(create_llm_client('openai'))
+    if kind != 'openai':
+        raise ValueError(f"Unknown LLM client: {kind}")
+    return OpenAI(
+        api_key=os.getenv('OPENAI_API_KEY'),
+        timeout=float(os.getenv('LLM_TIMEOUT', 20)),
+        max_retries=int(os.getenv('LLM_MAX_RETRIES', 2))
+    )
+
+def get_llm_client() -> OpenAI:
+    """Return the process-wide LLM client (LLM_CLIENT, OpenAI by default).
+
+    A single client keeps one pool of keep-alive connections, so consecutive
+    requests skip the TCP/TLS handshake.
+    """
+    global _client
+    with _lock:
+        if _client is None:
+            _client = create_llm_client()
+        return _client
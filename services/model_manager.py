@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from services.stt_backends import create_backend
+
+load_dotenv()
+
+class ModelManager:
+    """Process-wide cache of speech backends, loaded in the background on demand"""
+
+    IDLE = "idle"
+    LOADING = "loading"
+    READY = "ready"
+    ERROR = "error"
+
+    def __init__(self):
+        self._models = {}
+        self._events = {}
+        self._errors = {}
+        self._load_times = {}
+        self._lock = threading.Lock()
+
+    def _key(self, name=None, device=None, backend=None):
+        name = name or os.getenv('WHISPER_MODEL', 'base')
+        device = device or os.getenv('WHISPER_DEVICE', 'auto')
+        backend = backend or os.getenv('STT_BACKEND', 'whisper')
+        return (name, device, backend)
+
+    def preload(self, name=None, device=None, backend=None):
+        """Start loading a model in a background thread if it is not cached yet"""
+        key = self._key(name, device, backend)
+        with self._lock:
+            if key in self._events:
+                return self._events[key]
+            event = threading.Event()
+            self._events[key] = event
+            self._errors.pop(key, None)
+
+        thread = threading.Thread(target=self._load, args=(key, event), daemon=True)
+        thread.start()
+        return event
+
+    def _load(self, key, event):
+        name, device, backend = key
+        try:
+            start = time.perf_counter()
+            print(f"Loading {backend} model: {name}")
+            # Heavy imports (torch, whisper) happen inside load(), off the UI thread
+            model = create_backend(backend, name, device).load()
+
+            with self._lock:
+                self._models[key] = model
+                self._load_times[key] = time.perf_counter() - start
+            print(f"Model loaded successfully in {self._load_times[key]:.2f}s")
+        except Exception as e:
+            print(f"Error loading {backend} model {name}: {str(e)}")
+            with self._lock:
+                self._errors[key] = e
+                # Allow a later preload() to retry
+                self._events.pop(key, None)
+        finally:
+            event.set()
+
+    def get(self, name=None, device=None, backend=None, timeout=None):
+        """Return a loaded backend, waiting for (or starting) its load if needed"""
+        key = self._key(name, device, backend)
+        with self._lock:
+            model = self._models.get(key)
+        if model is not None:
+            return model
+
+        event = self.preload(*key)
+        if not event.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for {key[2]} model {key[0]}")
+
+        with self._lock:
+            if key in self._errors:
+                raise RuntimeError(f"{key[2]} model {key[0]} failed to load: {self._errors[key]}")
+            return self._models[key]
+
+    def state(self, name=None, device=None, backend=None):
+        """Return one of idle, loading, ready or error for a model"""
+        key = self._key(name, device, backend)
+        with self._lock:
+            if key in self._models:
+                return self.READY
+            if key in self._errors:
+                return self.ERROR
+            if key in self._events:
+                return self.LOADING
+            return self.IDLE
+
+    def load_time(self, name=None, device=None, backend=None):
+        """Seconds the model took to load, or None if it is not loaded"""
+        with self._lock:
+            return self._load_times.get(self._key(name, device, backend))
+
+# Create singleton instance
+model_manager = ModelManager()
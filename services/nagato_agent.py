@@ -1,176 +1,309 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
-from enum import Enum
-from datetime import datetime
-from services.computer_control import ComputerControl, OpenAppRequest, VolumeRequest, ScreenshotRequest
-from openai import OpenAI
+from services.commands import CommandType, Command, NagatoResponse
+from services.computer_control import ComputerControl
+from services.action_executor import ActionFailed
+from services.tool_registry import tool_registry
+from services.intent_matcher import IntentMatcher
+from services.command_cache import CommandCache
+from services.llm_client import get_llm_client
+from services.tracing import tracer
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 import os
-import json
+import time
 
-class CommandType(Enum):
-    OPEN_APP = "open_app"
-    VOLUME = "volume"
-    SCREENSHOT = "screenshot"
-    CONVERSATION = "conversation"
-
-class Command(BaseModel):
-    type: CommandType
-    content: dict
-
-class NagatoResponse(BaseModel):
-    message: str
-    action_taken: Optional[str] = None
-    success: bool = True
+# Kept short: the system prompt and tool schemas are sent with every parse request
+SINGLE_CALL_PROMPT = (
+    "You are Nagato, a friendly assistant controlling the user's computer. "
+    "For computer actions, reply only with tool calls, one per action, in order. "
+    "Turn relative volume requests (louder/quieter) into a level. "
+    "Otherwise answer briefly and naturally, without mentioning that you're an AI."
+)
+PARSER_PROMPT = (
+    "Map computer-control commands to tool calls, one per action, in order. "
+    "Turn relative volume requests (louder/quieter) into a level. "
+    "Reply with tool calls only."
+)
 
 class NagatoAgent:
-    def __init__(self):
-        self.computer = ComputerControl()
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, client=None, computer=None):
+        self.computer = computer or ComputerControl()
+        # Any object with the OpenAI chat.completions interface, e.g. services.fake_llm
+        self.client = client or get_llm_client()
+        # Let the parse request answer conversation directly instead of a second LLM call
+        self.single_call = os.getenv('LLM_SINGLE_CALL', 'true').lower() == 'true'
+        self.model = os.getenv('LLM_MODEL', 'gpt-4')
+        self.system_message = SINGLE_CALL_PROMPT if self.single_call else PARSER_PROMPT
+        self.intent_matcher = IntentMatcher()
+        self.cache = CommandCache() if os.getenv('COMMAND_CACHE', 'true').lower() == 'true' else None
+        # Runs the independent actions of a multi-action command side by side
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nagato-actions")
         
     def process_command(self, text: str) -> NagatoResponse:
-        """Process natural language command and execute appropriate action"""
+        """Process natural language command and execute appropriate actions"""
+        # Use LLM to parse the command and determine intent
+        return self.execute_commands(self.parse_command(text))
+
+    def execute_commands(self, commands: List[Command]) -> NagatoResponse:
+        """Execute parsed commands as one plan and summarise them in one response.
+
+        Independent actions run concurrently. A screenshot is a barrier, so it
+        captures the effect of everything asked for before it, and a second
+        command of the same type waits for the first ("volume 20 then 60").
+        """
+        if len(commands) == 1:
+            return self.execute_command(commands[0])
+
+        responses = []
+        with tracer.span("plan", actions=len(commands)):
+            for stage in self._plan(commands):
+                if len(stage) == 1:
+                    responses.append(self.execute_command(stage[0]))
+                    continue
+                # Each action gets its own copy of the trace context
+                futures = [self._pool.submit(tracer.bind(self.execute_command), command) for command in stage]
+                responses.extend(future.result() for future in futures)
+
+        actions = [response.action_taken for response in responses if response.action_taken]
+        return NagatoResponse(
+            message="\n".join(response.message for response in responses),
+            action_taken="\n".join(actions) or None,
+            # Partly done is not done: callers fall back or report the failure
+            success=all(response.success for response in responses)
+        )
+
+    @staticmethod
+    def has_action(commands: List[Command]) -> bool:
+        """Whether any command is a computer action rather than conversation"""
+        return any(command.type != CommandType.CONVERSATION for command in commands)
+
+    def _plan(self, commands: List[Command]) -> List[List[Command]]:
+        """Group commands into stages that run one after another"""
+        stages, stage = [], []
+        for command in commands:
+            if command.type == CommandType.SCREENSHOT:
+                if stage:
+                    stages.append(stage)
+                stages.append([command])
+                stage = []
+            elif any(queued.type == command.type for queued in stage):
+                stages.append(stage)
+                stage = [command]
+            else:
+                stage.append(command)
+        if stage:
+            stages.append(stage)
+        return stages
+
+    def execute_command(self, parsed: Command) -> NagatoResponse:
+        """Execute a parsed command"""
+        with tracer.span("execute", type=parsed.type.value):
+            return self._execute(parsed)
+
+    def _execute(self, parsed: Command) -> NagatoResponse:
         try:
-            # Use LLM to parse the command and determine intent
-            parsed = self.parse_command(text)
-            
-            if parsed.type == CommandType.OPEN_APP:
-                request = OpenAppRequest(**parsed.content)
-                result = self.computer.open_application(request.app_name)
-                return NagatoResponse(
-                    message=f"Sure! {result}",
-                    action_taken=f"Opened {request.app_name}",
-                    success=True
-                )
-                
-            elif parsed.type == CommandType.VOLUME:
-                request = VolumeRequest(**parsed.content)
-                result = self.computer.adjust_volume(request.level)
+            tool = tool_registry.for_type(parsed.type)
+            if tool is not None:
+                request = tool.request_model(**parsed.content)
+                fields = request.model_dump()
+                result = getattr(self.computer, tool.method)(**fields)
                 return NagatoResponse(
-                    message=f"Alright, {result}",
-                    action_taken=f"Adjusted volume to {request.level}%",
+                    message=tool.message.format(result=result),
+                    action_taken=tool.action_taken.format(**fields),
                     success=True
                 )
-                
-            elif parsed.type == CommandType.SCREENSHOT:
-                request = ScreenshotRequest(**parsed.content)
-                result = self.computer.take_screenshot(request.filename)
+
+            elif parsed.content.get("reply"):
                 return NagatoResponse(
-                    message=f"Done! {result}",
-                    action_taken="Took screenshot",
+                    message=parsed.content["reply"],
                     success=True
                 )
-                
+
             else:
                 return NagatoResponse(
                     message="I'm not sure how to help with that yet.",
                     success=False
                 )
                 
+        except ActionFailed as e:
+            # The action ran but did not take effect, so nothing is reported as done
+            return NagatoResponse(message=str(e), success=False)
         except Exception as e:
             return NagatoResponse(
                 message=f"Sorry, I encountered an error: {str(e)}",
                 success=False
             )
 
-    def parse_command(self, text: str) -> Command:
-        """Use LLM to parse the command and determine the intent"""
-        
-        function_descriptions = {
-            "functions": [
-                {
-                    "name": "open_application",
-                    "description": "Open an application on the computer",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "app_name": {
-                                "type": "string",
-                                "description": "Name of the application to open"
-                            }
-                        },
-                        "required": ["app_name"]
-                    }
-                },
-                {
-                    "name": "adjust_volume",
-                    "description": "Adjust the system volume",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "level": {
-                                "type": "integer",
-                                "description": "Volume level (0-100)",
-                                "minimum": 0,
-                                "maximum": 100
-                            }
-                        },
-                        "required": ["level"]
-                    }
-                },
-                {
-                    "name": "take_screenshot",
-                    "description": "Take a screenshot of the screen",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "filename": {
-                                "type": "string",
-                                "description": "Optional filename for the screenshot"
-                            }
-                        }
-                    }
-                }
-            ]
-        }
+    def parse_command(self, text: str) -> List[Command]:
+        """Determine the intents, locally when possible and with the LLM otherwise"""
+        with tracer.span("parse") as span:
+            commands = self._parse(text)
+            types = ", ".join(command.type.value for command in commands)
+            span.set(source=commands[0].source, types=types)
+        print(f"Parsed by {commands[0].source} in {span.duration * 1000:.1f}ms ({types})")
+        return commands
+
+    def _parse(self, text: str) -> List[Command]:
+        command, confidence = self.intent_matcher.match(text)
+        if command is not None and confidence >= self.intent_matcher.threshold:
+            return [command]
+
+        if self.cache:
+            commands = self.cache.get(text)
+            if commands is not None:
+                return commands
 
+        commands = self.parse_with_llm(text)
+        if self.cache:
+            self.cache.put(text, commands)
+        return commands
+
+    def parse_with_llm(self, text: str) -> List[Command]:
+        """Use LLM to parse the command into one or more intents"""
         try:
             # Ask LLM to understand the command
-            response = self.client.chat.completions.create(
-                model=os.getenv('LLM_MODEL', 'gpt-4'),
-                messages=[
-                    {"role": "system", "content": """You are a command parser for a computer control system. 
-                    Analyze user commands and map them to the appropriate function call. 
-                    For volume commands, understand relative terms (louder/quieter) and convert them to appropriate levels.
-                    Respond only with the function call, no other text."""},
-                    {"role": "user", "content": text}
-                ],
-                functions=function_descriptions["functions"],
-                function_call="auto"
+            with tracer.span("llm.parse") as span:
+                response = self.client.chat.completions.create(**self._llm_request(text))
+                if getattr(response, "usage", None):
+                    span.set(prompt_tokens=response.usage.prompt_tokens)
+            message = response.choices[0].message
+
+            # One tool call per requested action, in the order given
+            commands = self._commands_from_tool_calls(
+                (call.function.name, call.function.arguments) for call in message.tool_calls or []
             )
+            if commands:
+                return commands
 
-            # Extract the function call
-            if response.choices[0].message.function_call:
-                func_name = response.choices[0].message.function_call.name
-                func_args = json.loads(response.choices[0].message.function_call.arguments)
-
-                # Map to appropriate command type
-                if func_name == "open_application":
-                    return Command(
-                        type=CommandType.OPEN_APP,
-                        content={"app_name": func_args["app_name"]}
-                    )
-                elif func_name == "adjust_volume":
-                    return Command(
-                        type=CommandType.VOLUME,
-                        content={"level": func_args["level"]}
-                    )
-                elif func_name == "take_screenshot":
-                    return Command(
-                        type=CommandType.SCREENSHOT,
-                        content={"filename": func_args.get("filename")}
-                    )
-
-            return Command(
+            reply = message.content
+            if self.single_call and reply:
+                return [Command(
+                    type=CommandType.CONVERSATION,
+                    content={"reply": reply.strip()}
+                )]
+
+            return [Command(
                 type=CommandType.CONVERSATION,
                 content={}
-            )
+            )]
 
         except Exception as e:
             print(f"Error parsing command: {str(e)}")
-            return Command(
+            return [Command(
                 type=CommandType.CONVERSATION,
                 content={}
-            )
+            )]
+
+    def stream_command(self, text: str, cancel_event=None, commands=None):
+        """Process a command, yielding the response text as it is generated.
+
+        Actions are executed once all their tool calls have fully arrived and
+        yield one combined message. Conversational replies (single-call mode)
+        are yielded token by token. Nothing is yielded when the LLM produced
+        neither, so the caller can fall back to a separate conversation call.
+        Setting cancel_event aborts the in-flight stream. `commands` already
+        parsed for this text (e.g. a committed speculation) skip parsing.
+        """
+        if commands is not None:
+            if all(command.type == CommandType.CONVERSATION and not command.content.get("reply")
+                   for command in commands):
+                # Neither an action nor a reply: the caller falls back to conversation
+                return
+            # Like the streamed path below: a failed action is reported, not hidden
+            yield self.execute_commands(commands).to_text()
+            return
+
+        with tracer.span("parse") as span:
+            commands = None
+            command, confidence = self.intent_matcher.match(text)
+            if command is not None and confidence >= self.intent_matcher.threshold:
+                commands = [command]
+            elif self.cache:
+                commands = self.cache.get(text)
+            span.set(source=commands[0].source if commands else "llm")
+
+        if commands:
+            types = ", ".join(command.type.value for command in commands)
+            print(f"Parsed without LLM ({commands[0].source}, {types})")
+            yield self.execute_commands(commands).to_text()
+            return
+
+        # Spans are recorded after the fact here: a generator may be closed from another context
+        start = time.perf_counter()
+        cancelled = False
+        calls = {}  # Tool call index -> [name, accumulated arguments]
+        prompt_tokens = None
+        stream = self.client.chat.completions.create(
+            **self._llm_request(text), stream=True, stream_options={"include_usage": True}
+        )
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    print("LLM stream cancelled")
+                    cancelled = True
+                    return
+                if getattr(chunk, "usage", None):
+                    prompt_tokens = chunk.usage.prompt_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.tool_calls:
+                    for call in delta.tool_calls:
+                        entry = calls.setdefault(call.index, ["", ""])
+                        if call.function.name:
+                            entry[0] = call.function.name
+                        entry[1] += call.function.arguments or ""
+                elif delta.content and self.single_call:
+                    yield delta.content
+        finally:
+            stream.close()
+            span = tracer.record("llm.stream", start, cancelled=cancelled, tool_calls=len(calls),
+                                 prompt_tokens=prompt_tokens)
+
+        print(f"Streamed LLM response in {span.duration * 1000:.0f}ms")
+
+        commands = self._commands_from_tool_calls(calls[index] for index in sorted(calls))
+        if commands:
+            if self.cache:
+                self.cache.put(text, commands)
+            yield self.execute_commands(commands).to_text()
+
+    def _llm_request(self, text: str) -> dict:
+        """Build the chat completion arguments for parsing a command"""
+        # Everything but the user message is identical across requests
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_message},
+                {"role": "user", "content": text}
+            ],
+            "tools": tool_registry.schemas(),
+            "tool_choice": "auto",
+            # "Open Firefox and set the volume to 30" comes back as two calls
+            "parallel_tool_calls": True,
+            "max_tokens": 150
+        }
+
+    def _commands_from_tool_calls(self, calls) -> List[Command]:
+        """Commands for (name, arguments) pairs, skipping unknown or malformed calls"""
+        commands = []
+        for name, arguments in calls:
+            try:
+                command = self._command_from_function_call(name, arguments)
+            except (ValueError, KeyError) as e:
+                print(f"Ignoring malformed tool call {name}: {str(e)}")
+                continue
+            if command is not None:
+                commands.append(command)
+        return commands
+
+    def _command_from_function_call(self, func_name: str, arguments: str):
+        """Map an LLM tool call to a Command, or None if it is unknown"""
+        tool = tool_registry.get(func_name)
+        if tool is None:
+            return None
+        # Validates the arguments against the same model the action uses
+        request = tool.request_model.model_validate_json(arguments or "{}")
+        return Command(type=tool.command_type, content=request.model_dump())
 
 # Create singleton instance
 nagato_agent = NagatoAgent() 
\ No newline at end of file
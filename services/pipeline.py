@@ -0,0 +1,187 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from services.speculative_parser import speculative_parser
+from services.tracing import tracer
+
+# Marks the end of a response stream
+_END = object()
+
+class CommandPipeline:
+    """Runs listen -> respond for each activation off the Tk thread.
+
+    Stages run on an asyncio loop in a background thread. Microphone capture
+    and Whisper run on the dedicated recognition worker; the LLM and actions
+    run in a small thread pool. Results are published to `events`, a
+    thread-safe queue the UI polls, as (request_id, kind, payload) tuples
+    where kind is one of "trace", "status", "partial", "transcript",
+    "delta", "done", "empty" (nothing was heard; the request ends without
+    a transcript) or "error". Each request is one trace; its id is the
+    payload of the first "trace" event.
+
+    With speculative parsing enabled, stable partial transcripts are parsed
+    while recognition finishes. The result is used only if the final
+    transcript matches, and its actions run only after that point.
+    """
+
+    def __init__(self, max_workers=4):
+        self.events = queue.Queue()
+        self._loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nagato-pipeline")
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        self._lock = threading.Lock()
+        self._request_id = 0
+        self._future = None
+        self._cancel_event = None
+        self._stage = None
+
+    @property
+    def stage(self):
+        """Stage of the current request: listening, responding or None when idle"""
+        return self._stage
+
+    def submit(self, command=None):
+        """Start a new request, superseding one that is still responding.
+
+        A tap while the microphone is still capturing does not start a second
+        recording; the id of the request in progress is returned instead.
+        Passing `command` skips listening, e.g. when the wake phrase and the
+        command were spoken in one breath.
+        """
+        with self._lock:
+            if self._stage == "listening":
+                return self._request_id
+            self._cancel_locked()
+
+            self._request_id += 1
+            request_id = self._request_id
+            self._cancel_event = threading.Event()
+            self._stage = "listening"
+            self._future = asyncio.run_coroutine_threadsafe(
+                self._run(request_id, self._cancel_event, command), self._loop
+            )
+            return request_id
+
+    def cancel(self):
+        """Cancel the in-flight request, if any"""
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._cancel_event = None
+        self._stage = None
+
+    def _emit(self, request_id, kind, payload=None):
+        self.events.put((request_id, kind, payload))
+
+    def _set_stage(self, request_id, stage):
+        with self._lock:
+            if request_id == self._request_id:
+                self._stage = stage
+
+    async def _run(self, request_id, cancel_event, command=None):
+        with tracer.trace("command", request_id=request_id) as root:
+            self._emit(request_id, "trace", root.trace_id)
+            await self._stages(request_id, cancel_event, command)
+
+    async def _stages(self, request_id, cancel_event, command):
+        speculation = None
+        try:
+            commands = None
+            if not command:
+                if speculative_parser.enabled:
+                    speculation = speculative_parser.begin()
+                with tracer.span("listen"):
+                    command = await self._listen(request_id, speculation)
+            if cancel_event.is_set():
+                return
+            if not command.strip():
+                # Silence or noise: nothing to parse or answer, go back to idle
+                self._emit(request_id, "empty")
+                return
+            commands = await self._commit(speculation, command)
+            if cancel_event.is_set():
+                return
+            self._emit(request_id, "transcript", command)
+
+            self._set_stage(request_id, "responding")
+            self._emit(request_id, "status", "Processing...")
+            with tracer.span("respond", speculated=commands is not None):
+                await self._respond(request_id, command, cancel_event, commands)
+            self._emit(request_id, "done")
+
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+        except Exception as e:
+            print(f"Error in command pipeline: {str(e)}")
+            self._emit(request_id, "error", str(e))
+        finally:
+            if speculation is not None:
+                speculation.cancel()
+            self._set_stage(request_id, None)
+
+    async def _listen(self, request_id, speculation=None):
+        """Capture and transcribe one command on the recognition worker"""
+        from services.recognition_worker import recognition_worker
+
+        def on_partial(text):
+            self._emit(request_id, "partial", text)
+            if speculation is not None:
+                speculation.offer(text)
+
+        on_first_pass = None
+        if speculation is not None:
+            on_first_pass = lambda text: speculation.offer(text, stable=True)
+
+        # The worker serializes captures, so a cancelled request that is still
+        # recording can never overlap with the next one
+        future = recognition_worker.submit(on_partial=on_partial, on_first_pass=on_first_pass)
+        return await asyncio.wrap_future(future, loop=self._loop)
+
+    async def _commit(self, speculation, command):
+        """Commands speculatively parsed for the final transcript, or None to parse it now"""
+        future = speculation.resolve(command) if speculation is not None else None
+        if future is None:
+            return None
+        try:
+            return await asyncio.wrap_future(future, loop=self._loop)
+        except Exception as e:
+            print(f"Speculative parse failed: {str(e)}")
+            return None
+
+    async def _respond(self, request_id, command, cancel_event, commands=None):
+        """Parse (unless already parsed), execute and stream the reply, forwarding deltas as they arrive"""
+        deltas = asyncio.Queue()
+
+        def produce():
+            from services.process_command import command_processor
+            try:
+                for delta in command_processor.stream_command(command, cancel_event, commands):
+                    self._loop.call_soon_threadsafe(deltas.put_nowait, delta)
+            finally:
+                self._loop.call_soon_threadsafe(deltas.put_nowait, _END)
+
+        producer = self._loop.run_in_executor(self._executor, tracer.bind(produce))
+        while True:
+            delta = await deltas.get()
+            if delta is _END:
+                break
+            self._emit(request_id, "delta", delta)
+        await producer
+
+    def shutdown(self):
+        self.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._executor.shutdown(wait=False)
+
+# Create singleton instance
+command_pipeline = CommandPipeline()
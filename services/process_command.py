@@ -1,49 +1,99 @@
 import os
-from openai import OpenAI
+import time
 from dotenv import load_dotenv
+from services.llm_client import get_llm_client
+from services.tracing import tracer
 
 load_dotenv()
 
 class CommandProcessor:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    def __init__(self, client=None, agent=None):
+        self.client = client or get_llm_client()
         self.model = os.getenv('LLM_MODEL', 'gpt-4')
+        self._agent = agent
+
+    @property
+    def agent(self):
+        """The NagatoAgent commands go through (the shared one unless injected)"""
+        if self._agent is None:
+            from services.nagato_agent import nagato_agent
+            self._agent = nagato_agent
+        return self._agent
 
     def process_command(self, command_text):
         try:
             # Use Nagato agent to process the command
-            from services.nagato_agent import nagato_agent
+            commands = self.agent.parse_command(command_text)
+            response = self.agent.execute_commands(commands)
             
-            response = nagato_agent.process_command(command_text)
-            
-            if response.success:
-                if response.action_taken:
-                    return f"{response.message}\n{response.action_taken}"
-                return response.message
+            if response.success or self.agent.has_action(commands):
+                # A failed action is reported as such
+                return response.to_text()
             else:
-                # Fall back to conversational response if command fails
+                # Fall back to conversational response if no action fits
+                # (in single-call mode the agent already answered conversation itself)
                 return self._get_conversation_response(command_text)
                 
         except Exception as e:
             print(f"Error processing command: {str(e)}")
             return f"Sorry, I couldn't process that command: {str(e)}"
 
-    def _get_conversation_response(self, command_text):
-        """Get conversational response when command processing fails"""
+    def stream_command(self, command_text, cancel_event=None, commands=None):
+        """Like process_command, but yields the response text as it is generated"""
+        try:
+            produced = False
+            for delta in self.agent.stream_command(command_text, cancel_event, commands):
+                produced = True
+                yield delta
+
+            if not produced and not (cancel_event and cancel_event.is_set()):
+                # Fall back to conversational response if no action was chosen
+                yield from self._stream_conversation_response(command_text, cancel_event)
+
+        except Exception as e:
+            print(f"Error processing command: {str(e)}")
+            yield f"Sorry, I couldn't process that command: {str(e)}"
+
+    def _conversation_messages(self, command_text):
         system_message = """You are Nagato, a friendly and capable assistant. 
         Respond naturally to commands about controlling the computer, without mentioning 
         that you're an AI. Keep responses conversational and direct, as if you're 
         having a casual chat."""
 
-        response = self.client.chat.completions.create(
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": command_text}
+        ]
+
+    def _stream_conversation_response(self, command_text, cancel_event=None):
+        """Stream a conversational response token by token"""
+        start = time.perf_counter()
+        stream = self.client.chat.completions.create(
             model=self.model,
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": command_text}
-            ],
+            messages=self._conversation_messages(command_text),
             temperature=0.7,
-            max_tokens=150
+            max_tokens=150,
+            stream=True
         )
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+            tracer.record("llm.conversation", start, streaming=True)
+
+    def _get_conversation_response(self, command_text):
+        """Get conversational response when command processing fails"""
+        with tracer.span("llm.conversation", streaming=False):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._conversation_messages(command_text),
+                temperature=0.7,
+                max_tokens=150
+            )
 
         return response.choices[0].message.content
 
@@ -0,0 +1,154 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from services.tracing import tracer
+
+load_dotenv()
+
+class RecognitionWorker:
+    """Single long-lived thread that owns the microphone capture and the speech model.
+
+    Jobs are queued and run one at a time, so two activations can never
+    record or decode concurrently. A request made while another one is
+    still waiting or capturing is coalesced into it and gets the same
+    Future. Each job records how long it waited in the queue and how long
+    capture and transcription took.
+    """
+
+    STAGES = ("queue_wait", "capture", "transcribe", "total")
+
+    def __init__(self, vtt=None, num_threads=None, history=100):
+        self._vtt = vtt
+        self.num_threads = num_threads or int(os.getenv('TORCH_NUM_THREADS') or 0) or None
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._current = None
+        self._thread = None
+
+        self.completed = 0
+        self.coalesced = 0
+        self.timings = {stage: deque(maxlen=history) for stage in self.STAGES}
+        self.last_timings = {}
+
+    @property
+    def vtt(self):
+        if self._vtt is None:
+            from services.vtt import vtt_service
+            self._vtt = vtt_service
+        return self._vtt
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nagato-recognition", daemon=True)
+                self._thread.start()
+
+    def submit(self, on_partial=None, on_first_pass=None):
+        """Queue a capture + transcription; returns a Future resolving to the command text"""
+        self.start()
+        with self._lock:
+            current = self._current
+            if current is not None and not current["future"].done():
+                # Another activation while one is pending or capturing: share its result
+                self.coalesced += 1
+                if on_partial:
+                    current["on_partial"] = on_partial
+                    current["on_first_pass"] = on_first_pass
+                return current["future"]
+
+            job = {
+                "future": Future(),
+                "on_partial": on_partial,
+                "on_first_pass": on_first_pass,
+                "submitted": time.perf_counter(),
+                # Run in the submitter's trace so the capture spans join it
+                "run": tracer.bind(lambda on_partial, on_first_pass: self.vtt.get_voice_command(
+                    on_partial=on_partial, on_first_pass=on_first_pass
+                )),
+            }
+            self._current = job
+            self._jobs.put(job)
+            return job["future"]
+
+    @property
+    def queue_depth(self):
+        """Jobs waiting to start (0 or 1 thanks to coalescing)"""
+        return self._jobs.qsize()
+
+    def _configure_threads(self):
+        if not self.num_threads:
+            return
+        try:
+            import torch
+            torch.set_num_threads(self.num_threads)
+            print(f"Speech recognition using {self.num_threads} torch threads")
+        except ImportError:
+            pass
+
+    def _run(self):
+        self._configure_threads()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            future = job["future"]
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            started = time.perf_counter()
+            try:
+                # Look the callbacks up per call so a coalesced request can take them over
+                on_partial = on_first_pass = None
+                if job["on_partial"]:
+                    on_partial = lambda text: job["on_partial"](text)
+                if job["on_first_pass"]:
+                    on_first_pass = lambda text: job["on_first_pass"] and job["on_first_pass"](text)
+                command = job["run"](on_partial, on_first_pass)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(command)
+            finally:
+                self._record_timings(job["submitted"], started)
+
+    def _record_timings(self, submitted, started):
+        finished = time.perf_counter()
+        timings = {
+            "queue_wait": started - submitted,
+            "total": finished - submitted,
+        }
+        timings.update(getattr(self.vtt, "last_timings", {}))
+        with self._lock:
+            self.completed += 1
+            self.last_timings = timings
+            for stage, seconds in timings.items():
+                if stage in self.timings:
+                    self.timings[stage].append(seconds)
+
+    def stats(self):
+        """Queue depth, job counts and mean/max milliseconds per stage"""
+        with self._lock:
+            stages = {}
+            for stage, samples in self.timings.items():
+                if samples:
+                    stages[stage] = {
+                        "mean_ms": sum(samples) / len(samples) * 1000,
+                        "max_ms": max(samples) * 1000,
+                    }
+            return {
+                "queue_depth": self.queue_depth,
+                "busy": self._current is not None and not self._current["future"].done(),
+                "completed": self.completed,
+                "coalesced": self.coalesced,
+                "stages": stages,
+            }
+
+    def shutdown(self):
+        self._jobs.put(None)
+
+# Create singleton instance
+recognition_worker = RecognitionWorker()
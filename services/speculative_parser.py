@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from services.intent_matcher import normalize_text
+from services.tracing import tracer
+
+load_dotenv()
+
+class Speculation:
+    """Speculative parse of one request's partial transcripts.
+
+    offer() is called with each partial hypothesis while the user is still
+    speaking; once the same normalized text has come back from
+    `stable_partials` consecutive decodes, or right away for the first-pass
+    decode made when the user pauses (stable=True), it is parsed in the
+    background. A later, different stable text replaces the running
+    speculation. resolve() then compares the final transcript with what was
+    parsed. Only parsing ever happens here: actions run after the caller
+    commits.
+    """
+
+    def __init__(self, parser):
+        self._parser = parser
+        self._lock = threading.Lock()
+        self._last = None  # Normalized text of the previous partial
+        self._repeats = 0
+        self._text = None  # Normalized text being parsed
+        self._future = None
+        self._timing = None
+        self._closed = False
+
+    def offer(self, partial, stable=False):
+        """Feed a partial transcript; starts a parse once it is stable"""
+        text = normalize_text(partial)
+        with self._lock:
+            if self._closed or not text:
+                return
+            self._repeats = self._repeats + 1 if text == self._last else 1
+            self._last = text
+            if (not stable and self._repeats < self._parser.stable_partials) or text == self._text:
+                return
+            if self._future is not None:
+                # The transcript moved on; a parse already sent to the LLM cannot be
+                # recalled, its result is simply never used
+                self._future.cancel()
+                self._parser._count("discarded")
+            self._text = text
+            self._future, self._timing = self._parser._submit(partial.strip().lower())
+
+    def resolve(self, final_text):
+        """Future of the commands parsed for final_text, or None if there is nothing to commit.
+
+        The speculation is committed only when its normalized text equals
+        the final transcript's; otherwise it is discarded and the caller
+        parses the final text itself.
+        """
+        resolved = time.perf_counter()
+        with self._lock:
+            self._closed = True
+            future, text, timing = self._future, self._text, self._timing
+        if future is None:
+            return None
+        if text != normalize_text(final_text):
+            future.cancel()
+            self._parser._record(False, resolved, tracer.trace_id)
+            return None
+
+        trace_id = tracer.trace_id
+        future.add_done_callback(lambda f: self._parser._record(
+            not f.cancelled() and f.exception() is None, resolved, trace_id, timing
+        ))
+        return future
+
+    def cancel(self):
+        """Drop the speculation, e.g. when its request was cancelled"""
+        with self._lock:
+            self._closed = True
+            if self._future is not None:
+                self._future.cancel()
+
+
+class SpeculativeParser:
+    """Starts NagatoAgent.parse_command on partial transcripts so parsing overlaps the final decode.
+
+    Each listening request gets a Speculation from begin(). On a hit, the
+    parse (often an LLM round trip) has been running while Whisper finished,
+    and the time saved is how much of it was already done when the final
+    transcript arrived. `stats()` reports the hit rate and latency saved.
+    """
+
+    def __init__(self, agent=None, enabled=None, stable_partials=None, max_workers=2, history=100):
+        self._agent = agent
+        if enabled is None:
+            enabled = os.getenv('SPECULATIVE_PARSING', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.stable_partials = stable_partials or int(os.getenv('SPECULATION_STABLE_PARTIALS', 2))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nagato-speculation")
+        self._lock = threading.Lock()
+
+        self.counts = {"started": 0, "committed": 0, "missed": 0, "discarded": 0}
+        self.saved = deque(maxlen=history)
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            from services.nagato_agent import nagato_agent
+            self._agent = nagato_agent
+        return self._agent
+
+    def begin(self) -> Speculation:
+        return Speculation(self)
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+    def _submit(self, text):
+        self._count("started")
+        timing = {}
+
+        def parse():
+            timing["start"] = time.perf_counter()
+            try:
+                with tracer.span("speculate", text=text):
+                    return self.agent.parse_command(text)
+            finally:
+                timing["end"] = time.perf_counter()
+
+        # Keep the request's trace so the parse spans join it
+        return self._executor.submit(tracer.bind(parse)), timing
+
+    def _record(self, hit, resolved, trace_id, timing=None):
+        saved = 0.0
+        if hit:
+            # Parsing the final text would have taken the whole parse after `resolved`;
+            # only the part that ran past it is still waited for
+            duration = timing["end"] - timing["start"]
+            saved = max(0.0, duration - max(0.0, timing["end"] - resolved))
+        with self._lock:
+            self.counts["committed" if hit else "missed"] += 1
+            if hit:
+                self.saved.append(saved)
+        tracer.record("speculation", resolved, trace_id=trace_id, hit=hit, saved_ms=round(saved * 1000, 3))
+
+    def stats(self):
+        """Speculation counts, hit rate and milliseconds saved per committed parse"""
+        with self._lock:
+            resolved = self.counts["committed"] + self.counts["missed"]
+            saved = list(self.saved)
+            return {
+                **self.counts,
+                "hit_rate": self.counts["committed"] / resolved if resolved else 0.0,
+                "mean_saved_ms": sum(saved) / len(saved) * 1000 if saved else 0.0,
+                "total_saved_ms": sum(saved) * 1000,
+            }
+
+# Create singleton instance
+speculative_parser = SpeculativeParser()
@@ -0,0 +1,86 @@
+class StreamingTranscriber:
+    """Re-decode a growing utterance on a rolling window and emit partial hypotheses.
+
+    Words that two consecutive decodes agree on are treated as stable. Once the
+    window grows past `window` seconds, whole segments that are stable and end
+    at least `overlap` seconds before the live edge are committed, the window
+    start is moved past them and the committed text becomes the decode prompt.
+    """
+
+    def __init__(self, decode, sample_rate=16000, interval=1.0, window=8.0,
+                 overlap=1.0, on_partial=None):
+        # decode(audio, prompt) -> whisper-style result dict with "text" and "segments"
+        self.decode = decode
+        self.sample_rate = sample_rate
+        self.interval = int(interval * sample_rate)
+        self.window = int(window * sample_rate)
+        self.overlap = overlap
+        self.on_partial = on_partial
+        self.reset()
+
+    def reset(self):
+        self.committed_words = []
+        self.previous_words = []
+        self.current_words = []
+        self.window_start = 0
+        self.decoded_until = 0
+
+    @property
+    def committed_text(self):
+        return " ".join(self.committed_words)
+
+    @property
+    def hypothesis(self):
+        return " ".join(self.committed_words + self.current_words)
+
+    def due(self, captured):
+        """True when enough new audio has arrived since the last decode"""
+        return captured - self.decoded_until >= self.interval
+
+    def update(self, audio):
+        """Decode the current window of `audio` (the utterance so far)"""
+        window_audio = audio[self.window_start:]
+        result = self.decode(window_audio, self.committed_text or None)
+        self.decoded_until = len(audio)
+
+        words = result["text"].split()
+        stable = 0
+        for old, new in zip(self.previous_words, words):
+            if old != new:
+                break
+            stable += 1
+
+        if len(window_audio) > self.window:
+            words = self._commit_segments(result.get("segments", []), words, stable,
+                                          len(window_audio) / self.sample_rate)
+
+        self.previous_words = words
+        self.current_words = words
+        if self.on_partial:
+            self.on_partial(self.hypothesis)
+        return self.hypothesis
+
+    def _commit_segments(self, segments, words, stable, window_seconds):
+        committed = 0
+        advance = 0.0
+        for segment in segments:
+            segment_words = segment["text"].split()
+            if segment["end"] > window_seconds - self.overlap:
+                break
+            if committed + len(segment_words) > stable:
+                break
+            committed += len(segment_words)
+            advance = segment["end"]
+
+        if committed:
+            self.committed_words.extend(words[:committed])
+            self.window_start += int(advance * self.sample_rate)
+        return words[committed:]
+
+    def finalize(self, audio):
+        """Return the final transcript for the complete (silence-trimmed) utterance"""
+        if self.decoded_until and self.decoded_until >= len(audio):
+            # The last partial already covered all of the speech
+            return self.hypothesis
+        self.update(audio)
+        return self.hypothesis
@@ -0,0 +1,134 @@
+import os
+
+class SpeechBackend:
+    """Base class for speech-to-text engines.
+
+    transcribe() takes mono float32 audio at 16 kHz and returns a whisper-style
+    dict: {"text": str, "segments": [{"text": str, "start": float, "end": float}]}.
+    """
+
+    name = None
+
+    def __init__(self, model_name, device='auto'):
+        self.model_name = model_name
+        self.device = device
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio, prompt=None):
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios):
+        """Transcribe several clips; engines that can batch do it in one forward pass"""
+        return [self.transcribe(audio) for audio in audios]
+
+
+class WhisperBackend(SpeechBackend):
+    """openai-whisper running on PyTorch (fp16 on CUDA, fp32 on CPU)"""
+
+    name = "whisper"
+
+    def load(self):
+        import torch
+        import whisper
+
+        if self.device == 'auto':
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model = whisper.load_model(self.model_name, device=self.device)
+        return self
+
+    def transcribe(self, audio, prompt=None):
+        return self.model.transcribe(
+            audio,
+            fp16=self.device == "cuda",
+            initial_prompt=prompt
+        )
+
+    def transcribe_batch(self, audios):
+        """Decode clips of up to 30 s together as one batch of mel spectrograms"""
+        import torch
+        import whisper
+
+        window = whisper.audio.N_SAMPLES
+        if len(audios) == 1 or any(len(audio) > window for audio in audios):
+            # Longer clips need transcribe()'s sliding window
+            return super().transcribe_batch(audios)
+
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(audio)), self.model.dims.n_mels)
+            for audio in audios
+        ]).to(self.model.device)
+        options = whisper.DecodingOptions(fp16=self.device == "cuda", without_timestamps=True)
+        results = whisper.decode(self.model, mels, options)
+        return [{"text": result.text, "segments": []} for result in results]
+
+
+class QuantizedWhisperBackend(WhisperBackend):
+    """openai-whisper with its Linear layers dynamically quantized to int8 (CPU only)"""
+
+    name = "whisper-int8"
+
+    def load(self):
+        import torch
+        import whisper
+
+        self.device = "cpu"
+        model = whisper.load_model(self.model_name, device="cpu")
+
+        # Whisper wraps nn.Linear in its own subclass, which quantize_dynamic
+        # does not recognise; on CPU in fp32 the two behave identically.
+        for module in model.modules():
+            if isinstance(module, whisper.model.Linear):
+                module.__class__ = torch.nn.Linear
+
+        self.model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return self
+
+
+class FasterWhisperBackend(SpeechBackend):
+    """CTranslate2 engine from the optional faster-whisper package"""
+
+    name = "faster-whisper"
+
+    def load(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("STT_BACKEND=faster-whisper requires `pip install faster-whisper`")
+
+        device = "cpu" if self.device == 'auto' else self.device
+        compute_type = os.getenv('STT_COMPUTE_TYPE', 'int8' if device == "cpu" else 'float16')
+        self.model = WhisperModel(self.model_name, device=device, compute_type=compute_type)
+        self.device = device
+        return self
+
+    def transcribe(self, audio, prompt=None):
+        segments, _ = self.model.transcribe(audio, initial_prompt=prompt, beam_size=5)
+        segments = [
+            {"text": segment.text, "start": segment.start, "end": segment.end}
+            for segment in segments
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments
+        }
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (WhisperBackend, QuantizedWhisperBackend, FasterWhisperBackend)
+}
+
+
+def create_backend(backend_name, model_name, device='auto'):
+    """Instantiate (without loading) the backend registered under backend_name"""
+    try:
+        backend_class = BACKENDS[backend_name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown STT_BACKEND '{backend_name}'. Options: {', '.join(BACKENDS)}"
+        )
+    return backend_class(model_name, device)
@@ -0,0 +1,95 @@
+import json
+from typing import Dict, Iterator, List, Optional, Type
+from pydantic import BaseModel
+from services.commands import CommandType
+
+
+def compact_schema(schema):
+    """Strip what the model does not need from a Pydantic JSON schema.
+
+    Titles are dropped, and Optional[X] (anyOf X/null with a null default)
+    becomes plain X: leaving the argument out already means None.
+    """
+    if isinstance(schema, list):
+        return [compact_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    schema = {key: value for key, value in schema.items() if key != "title"}
+    options = schema.get("anyOf")
+    if options and {"type": "null"} in options and len(options) == 2:
+        del schema["anyOf"]
+        schema.update(next(option for option in options if option != {"type": "null"}))
+        if schema.get("default", ...) is None:
+            del schema["default"]
+    return {key: compact_schema(value) for key, value in schema.items()}
+
+
+class Tool:
+    """One ComputerControl action exposed to the LLM"""
+
+    def __init__(self, name, request_model, command_type, method, description, message, action_taken):
+        self.name = name
+        self.request_model = request_model
+        self.command_type = command_type
+        self.method = method  # ComputerControl method name
+        self.description = description
+        self.message = message  # Formatted with the action's result
+        self.action_taken = action_taken  # Formatted with the request fields
+
+    @property
+    def schema(self) -> dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": compact_schema(self.request_model.model_json_schema()),
+            },
+        }
+
+
+class ToolRegistry:
+    """Actions registered once at import, looked up by tool name or command type.
+
+    The tool schemas sent with every parse request are derived from the
+    request models on first use and cached, so the payload (and its prompt
+    tokens) stays identical from one request to the next.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Tool] = {}
+        self._by_type: Dict[CommandType, Tool] = {}
+        self._schemas = None
+
+    def register(self, name: str, request_model: Type[BaseModel], command_type: CommandType,
+                 description: str, message: str, action_taken: str):
+        """Decorator registering a ComputerControl method as a tool"""
+        def decorator(fn):
+            tool = Tool(name, request_model, command_type, fn.__name__, description, message, action_taken)
+            self._tools[name] = tool
+            self._by_type[command_type] = tool
+            self._schemas = None
+            return fn
+        return decorator
+
+    def __iter__(self) -> Iterator[Tool]:
+        return iter(self._tools.values())
+
+    def get(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
+    def for_type(self, command_type: CommandType) -> Optional[Tool]:
+        return self._by_type.get(command_type)
+
+    def schemas(self) -> List[dict]:
+        if self._schemas is None:
+            self._schemas = [tool.schema for tool in self._tools.values()]
+        return self._schemas
+
+    def schemas_json(self) -> str:
+        """The tools payload as compact JSON, e.g. for counting prompt tokens"""
+        return json.dumps(self.schemas(), separators=(",", ":"))
+
+# Create singleton instance
+tool_registry = ToolRegistry()
@@ -0,0 +1,207 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_trace_id = contextvars.ContextVar("nagato_trace_id", default=None)
+_span_id = contextvars.ContextVar("nagato_span_id", default=None)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Span:
+    """One timed step of a command; start/end are time.perf_counter() values"""
+
+    def __init__(self, name, trace_id, parent_id, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent_id
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration(self):
+        """Seconds from start to end (or to now while the span is open)"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        return {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "time": time.time(),
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """Lightweight spans written as JSON lines to a rotating local file.
+
+    The current trace and parent span live in context variables, so nested
+    `span()` blocks are linked automatically, including across asyncio tasks.
+    Work handed to another thread keeps its trace when wrapped with `bind()`.
+    Recent spans are also kept in memory for `summary()` and the UI overlay.
+    """
+
+    def __init__(self, path=None, enabled=None, max_bytes=None, backups=None, history=500):
+        self.path = path or os.getenv('TRACE_PATH', 'logs/trace.jsonl')
+        if enabled is None:
+            enabled = os.getenv('TRACE_ENABLED', 'true').lower() == 'true'
+        self.enabled = enabled
+        self.max_bytes = max_bytes or int(os.getenv('TRACE_MAX_BYTES', 1_000_000))
+        self.backups = backups if backups is not None else int(os.getenv('TRACE_BACKUPS', 3))
+
+        self._lock = threading.Lock()
+        self._logger = None
+        self.durations = defaultdict(lambda: deque(maxlen=history))
+        self.max_traces = 20
+        self.traces = OrderedDict()  # trace id -> finished spans, most recently updated last
+
+    def _get_logger(self):
+        if self._logger is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            logger = logging.getLogger("nagato.trace")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    @property
+    def trace_id(self):
+        return _trace_id.get()
+
+    @contextmanager
+    def trace(self, name="command", **attrs):
+        """Start a new trace with a root span"""
+        token = _trace_id.set(uuid.uuid4().hex[:12])
+        try:
+            with self.span(name, **attrs) as span:
+                yield span
+        finally:
+            _trace_id.reset(token)
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time a block as a child of the current span"""
+        span = Span(name, _trace_id.get(), _span_id.get(), attrs)
+        token = _span_id.set(span.span_id)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _span_id.reset(token)
+            self._finish(span)
+
+    def record(self, name, start, end=None, trace_id=None, **attrs):
+        """Record a span measured elsewhere, e.g. on the Tk thread"""
+        span = Span(name, trace_id or _trace_id.get(), None, attrs)
+        span.start = start
+        span.end = end if end is not None else time.perf_counter()
+        self._finish(span)
+        return span
+
+    def bind(self, fn):
+        """Wrap fn so it runs in a copy of the current trace context on any thread"""
+        context = contextvars.copy_context()
+        return functools.partial(context.run, fn)
+
+    def _finish(self, span):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.durations[span.name].append(span.duration)
+            if span.trace_id is not None:
+                self.traces.setdefault(span.trace_id, []).append(span)
+                self.traces.move_to_end(span.trace_id)
+                if len(self.traces) > self.max_traces:
+                    self.traces.popitem(last=False)
+        try:
+            self._get_logger().info(json.dumps(span.to_dict()))
+        except OSError as e:
+            print(f"Error writing trace: {str(e)}")
+
+    def spans(self, trace_id=None):
+        """Finished spans of one trace (the latest by default), in finishing order"""
+        with self._lock:
+            if trace_id is None:
+                trace_id = next(reversed(self.traces), None)
+            return list(self.traces.get(trace_id, []))
+
+    def summary(self):
+        """p50/p95 milliseconds per span name over recent spans"""
+        with self._lock:
+            return {
+                name: {
+                    "count": len(samples),
+                    "p50_ms": percentile(samples, 0.5) * 1000,
+                    "p95_ms": percentile(samples, 0.95) * 1000,
+                }
+                for name, samples in self.durations.items()
+            }
+
+
+def traced(name):
+    """Decorator that records each call of a function as a span"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def load_spans(path):
+    """Read spans from a trace file and its rotated backups, oldest first"""
+    paths = [path]
+    index = 1
+    while os.path.exists(f"{path}.{index}"):
+        paths.append(f"{path}.{index}")
+        index += 1
+
+    spans = []
+    for current in reversed(paths):
+        if not os.path.exists(current):
+            continue
+        with open(current) as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return spans
+
+# Create singleton instance
+tracer = Tracer()
@@ -0,0 +1,134 @@
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """Frame-based voice activity detector using short-time energy and zero-crossing rate"""
+
+    def __init__(self, sample_rate=16000, frame_duration=0.03, energy_threshold=0.015,
+                 zcr_threshold=0.35, onset_frames=3, silence_duration=0.8,
+                 max_duration=10.0, pre_roll=0.3):
+        self.sample_rate = sample_rate
+        self.frame_size = int(sample_rate * frame_duration)
+        self.energy_threshold = energy_threshold
+        self.zcr_threshold = zcr_threshold
+        self.onset_frames = onset_frames
+        self.silence_frames = max(1, int(silence_duration / frame_duration))
+        self.max_samples = int(max_duration * sample_rate)
+        self.pre_roll_frames = max(0, int(pre_roll / frame_duration))
+        self.reset()
+
+    def reset(self):
+        """Clear all state so the detector can be reused for a new utterance"""
+        self.triggered = False
+        self.finished = False
+        self.voiced_run = 0
+        self.silent_run = 0
+        self.speech_end = 0
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._pre_roll = []
+        self._frames = []
+        self._captured = 0
+
+    def is_speech(self, frame):
+        """Classify a single float32 frame as speech or non-speech"""
+        if len(frame) == 0:
+            return False
+        energy = float(np.sqrt(np.mean(frame * frame)))
+        if energy < self.energy_threshold:
+            return False
+        # Broadband noise (fans, hiss) crosses zero far more often than voiced speech
+        signs = np.signbit(frame)
+        zcr = float(np.count_nonzero(signs[1:] != signs[:-1])) / len(frame)
+        return zcr < self.zcr_threshold
+
+    def process(self, block):
+        """Feed a block of PCM samples; returns True once the utterance is complete"""
+        if self.finished:
+            return True
+
+        samples = to_float32(block)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+
+        n_frames = len(samples) // self.frame_size
+        self._pending = samples[n_frames * self.frame_size:]
+
+        for i in range(n_frames):
+            frame = samples[i * self.frame_size:(i + 1) * self.frame_size]
+            self._process_frame(frame)
+            if self.finished:
+                break
+
+        return self.finished
+
+    def _process_frame(self, frame):
+        speech = self.is_speech(frame)
+
+        if not self.triggered:
+            self._pre_roll.append(frame)
+            if len(self._pre_roll) > self.pre_roll_frames + self.onset_frames:
+                self._pre_roll.pop(0)
+            self.voiced_run = self.voiced_run + 1 if speech else 0
+            if self.voiced_run >= self.onset_frames:
+                # Speech onset: keep a little audio from before the trigger
+                self.triggered = True
+                self._frames = list(self._pre_roll)
+                self._captured = sum(len(f) for f in self._frames)
+                self.speech_end = self._captured
+                self._pre_roll = []
+            return
+
+        self._frames.append(frame)
+        self._captured += len(frame)
+
+        if speech:
+            self.silent_run = 0
+            self.speech_end = self._captured
+        else:
+            self.silent_run += 1
+
+        if self.silent_run >= self.silence_frames or self._captured >= self.max_samples:
+            self.finished = True
+
+    @property
+    def captured(self):
+        """Number of samples captured since speech onset"""
+        return self._captured
+
+    def get_audio(self, trim=True):
+        """Return the captured utterance as float32 samples, trailing silence trimmed"""
+        if not self._frames:
+            return np.zeros(0, dtype=np.float32)
+        audio = np.concatenate(self._frames)
+        return audio[:self.speech_end] if trim else audio
+
+    def collect(self, blocks):
+        """Run the detector over an iterable of PCM blocks and return the utterance.
+
+        Lets recorded audio be replayed through the same detector as the microphone.
+        """
+        self.reset()
+        for block in blocks:
+            if self.process(block):
+                break
+        return self.get_audio()
+
+
+def to_float32(block):
+    """Convert int16 or float PCM (any shape) to mono float32 in [-1, 1]"""
+    samples = np.asarray(block)
+    if samples.ndim > 1:
+        samples = samples.reshape(len(samples), -1)[:, 0]
+    if samples.dtype == np.int16:
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32, copy=False)
+
+
+def resample(samples, source_rate, target_rate):
+    """Linearly resample float32 samples between sample rates"""
+    if source_rate == target_rate or not len(samples):
+        return samples
+    duration = len(samples) / source_rate
+    target = np.linspace(0, duration, int(duration * target_rate), endpoint=False)
+    source = np.arange(len(samples)) / source_rate
+    return np.interp(target, source, samples).astype(np.float32)
@@ -1,81 +1,276 @@
-import whisper
 import sounddevice as sd
 import numpy as np
-import torch
 import wave
 import os
+import threading
+import time
+import uuid
 from dotenv import load_dotenv
+from services.vad import VoiceActivityDetector, resample, to_float32
+from services.streaming_transcriber import StreamingTranscriber
+from services.model_manager import model_manager
+from services.audio_ring import AudioRingBuffer, microphone_buffer
+from services.tracing import tracer
 
 # Load environment variables
 load_dotenv()
 
+# Whisper models are trained on 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+
+def prepare_audio(recording, sample_rate):
+    """Convert PCM at any rate to mono float32 at 16 kHz"""
+    audio = resample(to_float32(recording), sample_rate, WHISPER_SAMPLE_RATE)
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
 class VoiceToText:
     def __init__(self):
         try:
             # Get configuration from environment
             self.WHISPER_MODEL = os.getenv('WHISPER_MODEL', 'base')
+            self.WHISPER_DEVICE = os.getenv('WHISPER_DEVICE', 'auto')
+            self.STT_BACKEND = os.getenv('STT_BACKEND', 'whisper')
             self.SAMPLE_RATE = int(os.getenv('SAMPLE_RATE', 16000))
             self.DURATION = int(os.getenv('RECORDING_DURATION', 5))
+            self.RECORDING_MODE = os.getenv('RECORDING_MODE', 'vad')
+            self.MAX_DURATION = float(os.getenv('MAX_RECORDING_DURATION', 10))
+            self.BLOCK_DURATION = 0.03
+
+            # Capture writes here; the VAD, streaming transcription and UI meter read from it
+            if microphone_buffer.sample_rate == self.SAMPLE_RATE:
+                self.ring_buffer = microphone_buffer
+            else:
+                self.ring_buffer = AudioRingBuffer(sample_rate=self.SAMPLE_RATE)
+
+            self.vad = VoiceActivityDetector(
+                sample_rate=self.SAMPLE_RATE,
+                frame_duration=self.BLOCK_DURATION,
+                energy_threshold=float(os.getenv('VAD_ENERGY_THRESHOLD', 0.015)),
+                silence_duration=float(os.getenv('VAD_SILENCE_DURATION', 0.8)),
+                max_duration=self.MAX_DURATION
+            )
+
+            # The model itself is loaded lazily (and cached) by model_manager
             
-            print(f"Loading Whisper model: {self.WHISPER_MODEL}")
-            self.model = whisper.load_model(self.WHISPER_MODEL)
-            print("Model loaded successfully")
-            
-            self.FILENAME = "temp/voice_command.wav"
-            os.makedirs("temp", exist_ok=True)
+            # Partial transcripts while the user is still speaking (vad mode only)
+            self.STREAMING = os.getenv('STREAMING_TRANSCRIPTION', 'true').lower() == 'true'
+            self.STREAM_INTERVAL = float(os.getenv('STREAM_INTERVAL', 1.0))
+            self.STREAM_WINDOW = float(os.getenv('STREAM_WINDOW', 8.0))
+            self.STREAM_OVERLAP = float(os.getenv('STREAM_OVERLAP', 1.0))
+            # Silence after which a first-pass decode of the whole utterance is made
+            self.FIRST_PASS_SILENCE = float(os.getenv('FIRST_PASS_SILENCE', 0.3))
+
+            # Recordings stay in memory; set SAVE_DEBUG_AUDIO=true to also dump WAVs
+            self.SAVE_DEBUG_AUDIO = os.getenv('SAVE_DEBUG_AUDIO', 'false').lower() == 'true'
+            self.DEBUG_AUDIO_DIR = "temp"
+
+            # Seconds spent capturing and transcribing the last command
+            self.last_timings = {}
             
         except Exception as e:
             print(f"Error initializing VoiceToText: {str(e)}")
             raise
 
-    def record_audio(self):
-        """Record audio from microphone"""
+    @property
+    def backend(self):
+        """The speech backend, waiting for the background load if it is still running"""
+        return model_manager.get(self.WHISPER_MODEL, self.WHISPER_DEVICE, self.STT_BACKEND)
+
+    @property
+    def model_state(self):
+        return model_manager.state(self.WHISPER_MODEL, self.WHISPER_DEVICE, self.STT_BACKEND)
+
+    def preload_model(self):
+        """Start loading the configured model without blocking"""
+        model_manager.preload(self.WHISPER_MODEL, self.WHISPER_DEVICE, self.STT_BACKEND)
+
+    def set_model(self, name, device=None, backend=None):
+        """Switch model or backend; previously loaded ones stay cached"""
+        self.WHISPER_MODEL = name
+        if device:
+            self.WHISPER_DEVICE = device
+        if backend:
+            self.STT_BACKEND = backend
+        self.preload_model()
+
+    def record_audio(self, on_block=None):
+        """Record audio from microphone and return float32 samples at 16 kHz"""
         try:
             print("Listening for command...")
-            recording = sd.rec(
-                int(self.DURATION * self.SAMPLE_RATE),
-                samplerate=self.SAMPLE_RATE,
-                channels=1,
-                dtype=np.int16
-            )
-            sd.wait()  # Wait until recording is finished
+            if self.RECORDING_MODE == 'fixed':
+                recording = self.record_fixed()
+            else:
+                recording = self.record_until_silence(on_block)
 
-            # Save as WAV file
-            with wave.open(self.FILENAME, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(2)
-                wf.setframerate(self.SAMPLE_RATE)
-                wf.writeframes(recording.tobytes())
+            audio = self.prepare_audio(recording, self.SAMPLE_RATE)
+            if self.SAVE_DEBUG_AUDIO:
+                self.save_debug_audio(audio)
 
-            print("Recording saved.")
+            print("Recording captured.")
+            return audio
             
         except Exception as e:
             print(f"Error recording audio: {str(e)}")
             raise
 
-    def transcribe_audio(self):
+    def prepare_audio(self, recording, sample_rate):
+        """Convert a recording once to the mono float32 16 kHz array Whisper expects"""
+        return prepare_audio(recording, sample_rate)
+
+    def save_debug_audio(self, audio):
+        """Write a uniquely named WAV copy of the audio for debugging"""
+        os.makedirs(self.DEBUG_AUDIO_DIR, exist_ok=True)
+        filename = os.path.join(
+            self.DEBUG_AUDIO_DIR,
+            f"voice_command_{int(time.time())}_{uuid.uuid4().hex[:8]}.wav"
+        )
+        with wave.open(filename, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(WHISPER_SAMPLE_RATE)
+            wf.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+        print(f"Debug audio saved to {filename}")
+        return filename
+
+    def record_fixed(self):
+        """Record for exactly RECORDING_DURATION seconds"""
+        recording = sd.rec(
+            int(self.DURATION * self.SAMPLE_RATE),
+            samplerate=self.SAMPLE_RATE,
+            channels=1,
+            dtype=np.int16
+        )
+        sd.wait()  # Wait until recording is finished
+        return recording
+
+    def record_until_silence(self, on_block=None):
+        """Stream from the microphone until the VAD sees the end of speech"""
+        audio_ready = threading.Event()
+
+        def callback(indata, frames, time_info, status):
+            if status:
+                print(f"Audio input status: {status}")
+            # The ring buffer is shared with the UI level meter; no per-block copies
+            self.ring_buffer.write(indata[:, 0])
+            audio_ready.set()
+
+        with sd.InputStream(
+            samplerate=self.SAMPLE_RATE,
+            channels=1,
+            dtype=np.float32,
+            blocksize=int(self.SAMPLE_RATE * self.BLOCK_DURATION),
+            callback=callback
+        ):
+            self.vad.reset()
+            for block in self.stream_blocks(audio_ready):
+                done = self.vad.process(block)
+                if on_block:
+                    on_block()
+                if done:
+                    break
+            audio = self.vad.get_audio()
+
+        if not self.vad.triggered:
+            print("No speech detected.")
+        return audio
+
+    def stream_blocks(self, audio_ready):
+        """Yield new audio from the ring buffer, giving up if nobody speaks within MAX_RECORDING_DURATION"""
+        max_samples = int(self.MAX_DURATION * self.SAMPLE_RATE)
+        position = self.ring_buffer.position
+        waited = 0
+        while True:
+            if not audio_ready.wait(timeout=1.0):
+                raise RuntimeError("No audio received from the microphone")
+            audio_ready.clear()
+            # Everything written since the last read, even if decoding kept us busy
+            block, position = self.ring_buffer.read_since(position)
+            if not self.vad.triggered:
+                waited += len(block)
+                if waited >= max_samples:
+                    return
+            yield block
+
+    def decode(self, audio, prompt=None):
+        """Run the speech backend on a float32 16 kHz array and return the full result"""
+        # Passing the array directly skips Whisper's ffmpeg decode of a file
+        return self.backend.transcribe(audio, prompt)
+
+    def transcribe_audio(self, audio):
         """Transcribe audio using Whisper"""
         try:
             print("Transcribing...")
-            result = self.model.transcribe(self.FILENAME)
-            
-            # Clean up the temporary file
-            try:
-                os.remove(self.FILENAME)
-            except:
-                pass
-                
-            return result["text"]
+            if len(audio) == 0:
+                return ""
+            return self.decode(audio)["text"]
             
         except Exception as e:
             print(f"Error transcribing audio: {str(e)}")
             raise
 
-    def get_voice_command(self):
-        """Main function to get voice command"""
+    def transcribe_streaming(self, on_partial, on_first_pass=None):
+        """Record and transcribe at the same time, reporting partial hypotheses.
+
+        With on_first_pass, the utterance is also decoded as soon as the user
+        has been silent for FIRST_PASS_SILENCE seconds, while the VAD still
+        waits to confirm the end, and on_first_pass gets that transcript.
+        Unless speech resumes, it is also the final one.
+        """
+        streamer = StreamingTranscriber(
+            lambda audio, prompt: self.decode(self.prepare_audio(audio, self.SAMPLE_RATE), prompt),
+            sample_rate=self.SAMPLE_RATE,
+            interval=self.STREAM_INTERVAL,
+            window=self.STREAM_WINDOW,
+            overlap=self.STREAM_OVERLAP,
+            on_partial=on_partial
+        )
+
+        first_pass_frames = max(1, int(self.FIRST_PASS_SILENCE / self.BLOCK_DURATION))
+        first_passed = [None]  # speech_end of the last first-pass decode
+
+        def on_block():
+            if not self.vad.triggered or self.vad.finished:
+                return
+            if on_first_pass and self.vad.silent_run >= first_pass_frames \
+                    and first_passed[0] != self.vad.speech_end:
+                first_passed[0] = self.vad.speech_end
+                streamer.update(self.vad.get_audio(trim=False))
+                on_first_pass(streamer.hypothesis)
+            elif streamer.due(self.vad.captured):
+                streamer.update(self.vad.get_audio(trim=False))
+
+        print("Listening for command...")
+        # Capture time includes the partial decodes that ran while recording
+        with tracer.span("stt.capture", streaming=True) as span:
+            recording = self.record_until_silence(on_block)
+        self.last_timings["capture"] = span.duration
+        if self.SAVE_DEBUG_AUDIO:
+            self.save_debug_audio(self.prepare_audio(recording, self.SAMPLE_RATE))
+        if len(recording) == 0:
+            return ""
+        with tracer.span("stt.transcribe", audio_seconds=len(recording) / self.SAMPLE_RATE) as span:
+            command = streamer.finalize(recording)
+        self.last_timings["transcribe"] = span.duration
+        return command
+
+    def get_voice_command(self, on_partial=None, on_first_pass=None):
+        """Main function to get voice command.
+
+        When on_partial is given, it is called with the running transcript
+        while the user is still speaking, and on_first_pass with the
+        transcript decoded once they pause (see transcribe_streaming).
+        """
+        self.last_timings = {}
         try:
-            self.record_audio()
-            command = self.transcribe_audio()
+            if on_partial and self.STREAMING and self.RECORDING_MODE != 'fixed':
+                command = self.transcribe_streaming(on_partial, on_first_pass)
+            else:
+                with tracer.span("stt.capture", streaming=False) as span:
+                    audio = self.record_audio()
+                self.last_timings["capture"] = span.duration
+                with tracer.span("stt.transcribe", audio_seconds=len(audio) / WHISPER_SAMPLE_RATE) as span:
+                    command = self.transcribe_audio(audio)
+                self.last_timings["transcribe"] = span.duration
             print(f"Recognized Command: {command}")
             return command.lower()
             
@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+import time
+from difflib import SequenceMatcher
+import numpy as np
+from dotenv import load_dotenv
+from services.vad import VoiceActivityDetector, resample, to_float32
+from services.model_manager import model_manager
+
+load_dotenv()
+
+class WakeWordDetector:
+    """Listens continuously for a wake phrase using a VAD-gated tiny Whisper model.
+
+    The idle loop only runs the energy/zero-crossing VAD. Short utterances it
+    finds (at most `max_utterance` seconds) are decoded with a small model and
+    fuzzy-matched against the wake phrase, so the expensive decode only runs
+    when someone actually speaks.
+    """
+
+    def __init__(self, on_wake=None, phrase=None, model_name=None, sample_rate=None,
+                 sensitivity=None, max_utterance=3.0):
+        self.on_wake = on_wake
+        self.phrase = self._words(phrase or os.getenv('WAKE_WORD', 'hey nagato'))
+        self.model_name = model_name or os.getenv('WAKE_WORD_MODEL', 'tiny')
+        self.sample_rate = sample_rate or int(os.getenv('SAMPLE_RATE', 16000))
+        self.sensitivity = sensitivity if sensitivity is not None else float(
+            os.getenv('WAKE_WORD_SENSITIVITY', 0.75)
+        )
+        self.block_duration = 0.03
+
+        self.vad = VoiceActivityDetector(
+            sample_rate=self.sample_rate,
+            frame_duration=self.block_duration,
+            energy_threshold=float(os.getenv('VAD_ENERGY_THRESHOLD', 0.015)),
+            silence_duration=0.4,
+            max_duration=max_utterance
+        )
+
+        self._thread = None
+        self._running = threading.Event()
+        self._paused = threading.Event()
+        # Set whenever the listener has no InputStream open
+        self._released = threading.Event()
+        self._released.set()
+
+        # CPU accounting for the idle loop
+        self.listen_seconds = 0.0
+        self.vad_cpu_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.decodes = 0
+        self.detections = 0
+
+    def _words(self, text):
+        return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+    def match(self, text):
+        """Return (matched, remaining words after the phrase) for a transcript"""
+        words = self._words(text)
+        size = len(self.phrase)
+        target = " ".join(self.phrase)
+        for start in range(0, max(1, len(words) - size + 1)):
+            candidate = " ".join(words[start:start + size])
+            if SequenceMatcher(None, candidate, target).ratio() >= self.sensitivity:
+                return True, " ".join(words[start + size:])
+        return False, ""
+
+    def _decode(self, audio):
+        start = time.perf_counter()
+        backend = model_manager.get(self.model_name)
+        text = backend.transcribe(resample(audio, self.sample_rate, 16000))["text"]
+        self.decode_seconds += time.perf_counter() - start
+        self.decodes += 1
+        return text
+
+    def process_block(self, block):
+        """Feed captured audio; returns the text following the wake phrase on detection, else None"""
+        cpu_start = time.thread_time()
+        finished = self.vad.process(block)
+        self.vad_cpu_seconds += time.thread_time() - cpu_start
+        self.listen_seconds += len(block) / self.sample_rate
+        if not finished:
+            return None
+
+        audio = self.vad.get_audio()
+        self.vad.reset()
+        matched, remainder = self.match(self._decode(audio))
+        if not matched:
+            return None
+        self.detections += 1
+        return remainder
+
+    def detect_in_audio(self, audio, sample_rate=None):
+        """Run the detector over a prerecorded array; returns detection times in seconds"""
+        samples = resample(to_float32(audio), sample_rate or self.sample_rate, self.sample_rate)
+
+        block = int(self.sample_rate * self.block_duration)
+        self.vad.reset()
+        detections = []
+        for start in range(0, len(samples), block):
+            if self.process_block(samples[start:start + block]) is not None:
+                detections.append((start + block) / self.sample_rate)
+        # Trailing silence so an utterance at the very end still completes
+        if self.vad.triggered:
+            silence = np.zeros(int(self.sample_rate * self.block_duration), dtype=np.float32)
+            for _ in range(int(1.0 / self.block_duration)):
+                remainder = self.process_block(silence)
+                if remainder is not None:
+                    detections.append(len(samples) / self.sample_rate)
+                if not self.vad.triggered:
+                    break
+        return detections
+
+    def start(self):
+        """Start listening in the background"""
+        if self._thread is not None:
+            return
+        model_manager.preload(self.model_name)
+        self._running.set()
+        self._thread = threading.Thread(target=self._listen, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        self._thread = None
+
+    def pause(self, timeout=2.0):
+        """Release the microphone, e.g. while a command is being captured.
+
+        Waits until the listener's InputStream is closed, so the caller can
+        open its own without two streams writing into microphone_buffer (or
+        an exclusive ALSA device reporting busy). Returns False if the
+        stream was still open after `timeout` seconds.
+        """
+        self._paused.set()
+        return self._released.wait(timeout)
+
+    def resume(self):
+        self._paused.clear()
+
+    def _listen(self):
+        import sounddevice as sd
+        from services.audio_ring import microphone_buffer
+
+        audio_ready = threading.Event()
+
+        def callback(indata, frames, time_info, status):
+            microphone_buffer.write(indata[:, 0])
+            audio_ready.set()
+
+        while self._running.is_set():
+            # Cleared before checking for a pause, so pause() never returns while a stream is about to open
+            self._released.clear()
+            if self._paused.is_set():
+                self._released.set()
+                time.sleep(0.1)
+                continue
+
+            try:
+                with sd.InputStream(
+                    samplerate=self.sample_rate,
+                    channels=1,
+                    dtype=np.float32,
+                    blocksize=int(self.sample_rate * self.block_duration),
+                    callback=callback
+                ):
+                    self.vad.reset()
+                    position = microphone_buffer.position
+                    while self._running.is_set() and not self._paused.is_set():
+                        if not audio_ready.wait(timeout=1.0):
+                            continue
+                        audio_ready.clear()
+                        block, position = microphone_buffer.read_since(position)
+                        remainder = self.process_block(block)
+                        if remainder is not None:
+                            print(f"Wake word detected{': ' + remainder if remainder else ''}")
+                            # Hand the microphone over before the main capture starts
+                            self._paused.set()
+                            if self.on_wake:
+                                self.on_wake(remainder)
+                            break
+            except Exception as e:
+                print(f"Error in wake word listener: {str(e)}")
+                self._released.set()
+                time.sleep(1.0)
+            self._released.set()
+
+    def stats(self):
+        """CPU cost of the idle loop and decode activity"""
+        listened = max(self.listen_seconds, 1e-9)
+        return {
+            "listened_seconds": self.listen_seconds,
+            "vad_cpu_percent": 100 * self.vad_cpu_seconds / listened,
+            "decodes": self.decodes,
+            "decode_seconds": self.decode_seconds,
+            "decode_percent": 100 * self.decode_seconds / listened,
+            "detections": self.detections,
+        }
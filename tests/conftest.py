@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Never reach the OpenAI API, run desktop commands or write caches and traces from tests
+os.environ['LLM_CLIENT'] = 'fake'
+os.environ['ACTION_BACKEND'] = 'fake'
+os.environ['COMMAND_CACHE'] = 'false'
+os.environ['TRACE_ENABLED'] = 'false'
+
+# Imported once the environment is set: services read it at import time
+import threading  # noqa: E402
+
+import pytest  # noqa: E402
+
+from services.action_executor import ActionFailed
+from services.fake_llm import FakeLLMClient
+from services.nagato_agent import NagatoAgent
+
+
+class RecordingComputer:
+    """ComputerControl stand-in that records the actions it is asked to run.
+
+    Methods named in `fail` raise ActionFailed, as an action that did not
+    take effect does.
+    """
+
+    def __init__(self):
+        self.fail = set()
+        self.actions = []
+        self._lock = threading.Lock()
+
+    def _act(self, method, message, **fields):
+        with self._lock:
+            self.actions.append((method, fields))
+        if method in self.fail:
+            raise ActionFailed(f"{method} failed")
+        return message
+
+    def open_application(self, app_name):
+        return self._act("open_application", f"Opened {app_name}", app_name=app_name)
+
+    def adjust_volume(self, level):
+        return self._act("adjust_volume", f"Volume set to {level}%", level=level)
+
+    def take_screenshot(self, filename=None):
+        return self._act("take_screenshot", "Screenshot saved", filename=filename)
+
+
+@pytest.fixture
+def computer():
+    return RecordingComputer()
+
+
+@pytest.fixture
+def make_agent(computer):
+    """Factory for agents acting on `computer` whose fake LLM never sees a local match.
+
+    The LLM answers every request with `reply` ({"tool_calls": [...]} or
+    {"content": ...}), or with the fake client's clause matcher by default.
+    """
+    def make(reply=None):
+        responder = (lambda text: reply) if reply is not None else None
+        client = FakeLLMClient(latency=0, token_latency=0, responder=responder)
+        agent = NagatoAgent(client=client, computer=computer)
+        agent.intent_matcher.threshold = float("inf")
+        return agent
+    return make
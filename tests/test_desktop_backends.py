@@ -0,0 +1,36 @@
+from services.action_executor import ActionResult
+from services.desktop_backends import DesktopEntryIndex, LinuxBackend
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.runs = []
+
+    def run(self, argv, detach=False):
+        self.runs.append((argv, detach))
+        return ActionResult(argv=argv)
+
+
+def write_entry(directory, name, exec_line):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{name.lower()}.desktop").write_text(
+        f"[Desktop Entry]\nType=Application\nName={name}\nExec={exec_line}\n"
+    )
+
+
+def test_installed_apps_launch_from_their_desktop_entry(tmp_path):
+    write_entry(tmp_path, "Firefox", "/usr/bin/firefox %u")
+    executor = RecordingExecutor()
+    backend = LinuxBackend(executor, index=DesktopEntryIndex([str(tmp_path)]))
+    assert backend.open_application("firefox").success
+    assert executor.runs == [(["/usr/bin/firefox"], True)]
+
+
+def test_commands_on_path_without_an_entry_are_not_run(tmp_path):
+    # "sh" is on every PATH but is not an installed desktop application
+    executor = RecordingExecutor()
+    backend = LinuxBackend(executor, index=DesktopEntryIndex([str(tmp_path)]))
+    result = backend.open_application("sh")
+    assert not result.success
+    assert "no installed application matches" in result.error
+    assert executor.runs == []
@@ -0,0 +1,133 @@
+import json
+
+from services.commands import Command, CommandType
+
+
+def call(name, **arguments):
+    return {"name": name, "arguments": json.dumps(arguments)}
+
+
+def command(type, **content):
+    return Command(type=type, content=content)
+
+
+def test_tool_calls_keep_their_order(make_agent):
+    agent = make_agent()
+    commands = agent._commands_from_tool_calls([
+        ("adjust_volume", '{"level": 30}'),
+        ("open_application", '{"app_name": "Firefox"}'),
+        ("take_screenshot", "{}"),
+    ])
+    assert [(c.type, c.content) for c in commands] == [
+        (CommandType.VOLUME, {"level": 30}),
+        (CommandType.OPEN_APP, {"app_name": "Firefox"}),
+        (CommandType.SCREENSHOT, {"filename": None}),
+    ]
+
+
+def test_malformed_and_unknown_tool_calls_are_skipped(make_agent):
+    agent = make_agent()
+    commands = agent._commands_from_tool_calls([
+        ("open_application", '{"app_name": '),  # Truncated JSON
+        ("adjust_volume", '{"level": 250}'),  # Out of range
+        ("open_application", '{}'),  # Missing argument
+        ("reboot", '{}'),  # Not a registered tool
+        ("adjust_volume", '{"level": 40}'),
+    ])
+    assert [(c.type, c.content) for c in commands] == [(CommandType.VOLUME, {"level": 40})]
+
+
+def test_parse_with_llm_returns_one_command_per_tool_call(make_agent):
+    agent = make_agent({"tool_calls": [call("open_application", app_name="Slack"), call("adjust_volume", level=20)]})
+    commands = agent.parse_command("open slack and set the volume to 20")
+    assert [c.type for c in commands] == [CommandType.OPEN_APP, CommandType.VOLUME]
+    assert commands[0].content == {"app_name": "Slack"}
+
+
+def test_plan_runs_independent_actions_together(make_agent):
+    agent = make_agent()
+    open_app = command(CommandType.OPEN_APP, app_name="Firefox")
+    volume = command(CommandType.VOLUME, level=30)
+    assert agent._plan([open_app, volume]) == [[open_app, volume]]
+
+
+def test_plan_screenshot_is_a_barrier(make_agent):
+    agent = make_agent()
+    open_app = command(CommandType.OPEN_APP, app_name="Firefox")
+    volume = command(CommandType.VOLUME, level=30)
+    screenshot = command(CommandType.SCREENSHOT, filename=None)
+    later = command(CommandType.OPEN_APP, app_name="Slack")
+    assert agent._plan([open_app, volume, screenshot, later]) == [[open_app, volume], [screenshot], [later]]
+
+
+def test_plan_serializes_commands_of_the_same_type(make_agent):
+    agent = make_agent()
+    low = command(CommandType.VOLUME, level=20)
+    open_app = command(CommandType.OPEN_APP, app_name="Firefox")
+    high = command(CommandType.VOLUME, level=60)
+    assert agent._plan([low, open_app, high]) == [[low, open_app], [high]]
+
+
+def test_execute_commands_runs_stages_in_order(make_agent, computer):
+    agent = make_agent()
+    response = agent.execute_commands([
+        command(CommandType.VOLUME, level=20),
+        command(CommandType.SCREENSHOT, filename=None),
+        command(CommandType.VOLUME, level=60),
+    ])
+    assert response.success
+    assert computer.actions == [
+        ("adjust_volume", {"level": 20}),
+        ("take_screenshot", {"filename": None}),
+        ("adjust_volume", {"level": 60}),
+    ]
+    assert response.action_taken.splitlines() == ["Adjusted volume to 20%", "Took screenshot", "Adjusted volume to 60%"]
+
+
+def test_execute_commands_fails_when_any_action_fails(make_agent, computer):
+    computer.fail.add("adjust_volume")
+    agent = make_agent()
+    response = agent.execute_commands([
+        command(CommandType.OPEN_APP, app_name="Firefox"),
+        command(CommandType.VOLUME, level=30),
+    ])
+    assert not response.success
+    assert response.action_taken == "Opened Firefox"
+    assert "adjust_volume failed" in response.message
+
+
+def test_stream_command_accumulates_streamed_tool_calls(make_agent, computer):
+    # Arguments arrive in four-character pieces; only the first delta of a call names it
+    agent = make_agent({"tool_calls": [
+        call("open_application", app_name="Visual Studio Code"),
+        call("adjust_volume", level=35),
+        call("take_screenshot"),
+    ]})
+    reply = "".join(agent.stream_command("open vs code, volume 35 and take a screenshot"))
+    assert computer.actions == [
+        ("open_application", {"app_name": "Visual Studio Code"}),
+        ("adjust_volume", {"level": 35}),
+        ("take_screenshot", {"filename": None}),
+    ]
+    assert "Opened Visual Studio Code" in reply
+
+
+def test_stream_command_yields_conversation_tokens(make_agent):
+    agent = make_agent({"content": "Hello there, nice to meet you."})
+    deltas = list(agent.stream_command("hi"))
+    assert len(deltas) > 1
+    assert "".join(deltas) == "Hello there, nice to meet you."
+
+
+def test_committed_commands_report_a_failed_action(make_agent, computer):
+    computer.fail.add("open_application")
+    agent = make_agent()
+    reply = "".join(agent.stream_command("open firefox", commands=[command(CommandType.OPEN_APP, app_name="Firefox")]))
+    assert reply == "open_application failed"
+
+
+def test_committed_conversation_without_reply_yields_nothing(make_agent):
+    agent = make_agent()
+    assert list(agent.stream_command("hmm", commands=[command(CommandType.CONVERSATION)])) == []
+    reply = "".join(agent.stream_command("hi", commands=[command(CommandType.CONVERSATION, reply="Hello!")]))
+    assert reply == "Hello!"
@@ -0,0 +1,17 @@
+from services.fake_llm import FakeLLMClient
+from services.process_command import CommandProcessor
+
+
+def test_failed_action_is_reported_not_replaced_by_conversation(make_agent, computer):
+    computer.fail.add("open_application")
+    agent = make_agent()
+    processor = CommandProcessor(client=agent.client, agent=agent)
+    assert processor.process_command("open firefox") == "open_application failed"
+
+
+def test_no_action_falls_back_to_conversation(make_agent):
+    agent = make_agent({"content": None})
+    agent.single_call = False
+    client = FakeLLMClient(latency=0, token_latency=0, responder=lambda text: {"content": "Hi there!"})
+    processor = CommandProcessor(client=client, agent=agent)
+    assert processor.process_command("how are you") == "Hi there!"
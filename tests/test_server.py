@@ -0,0 +1,132 @@
+import http.client
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from server import NagatoServer
+from services.action_executor import ActionFailed, ActionResult
+from services.computer_control import ComputerControl
+
+
+class FakeTranscriber:
+    def transcribe(self, audio):
+        return {"text": "Take a screenshot"}
+
+    def stats(self):
+        return {}
+
+    def shutdown(self):
+        pass
+
+
+@pytest.fixture
+def make_server(make_agent):
+    servers = []
+
+    def make(**kwargs):
+        server = NagatoServer(("127.0.0.1", 0), transcriber=FakeTranscriber(), agent=make_agent(), **kwargs)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def request(server, method, path, body=None, headers=None, encode_chunked=False):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=5)
+    try:
+        connection.request(method, path, body=body, headers=headers or {}, encode_chunked=encode_chunked)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_text_is_only_parsed_by_default(make_server, computer):
+    status, payload = request(make_server(), "POST", "/text", json.dumps({"text": "volume 40"}))
+    assert status == 200
+    assert payload["commands"][0]["content"] == {"level": 40}
+    assert payload["response"] is None
+    assert computer.actions == []
+
+
+def test_execute_runs_the_actions(make_server, computer):
+    status, payload = request(make_server(), "POST", "/text?execute=1", json.dumps({"text": "volume 40"}))
+    assert status == 200
+    assert payload["response"]["success"]
+    assert computer.actions == [("adjust_volume", {"level": 40})]
+
+
+def test_command_transcribes_raw_pcm(make_server, computer):
+    pcm = (np.sin(np.arange(1600) / 5) * 8000).astype("<i2").tobytes()
+    status, payload = request(make_server(), "POST", "/command?sample_rate=8000", pcm)
+    assert status == 200
+    assert payload["text"] == "take a screenshot"
+    assert payload["commands"][0]["type"] == "screenshot"
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/transcribe?sample_rate=0", b"\x00\x00" * 100),
+    ("/transcribe?sample_rate=-8000", b"\x00\x00" * 100),
+    ("/transcribe?sample_rate=fast", b"\x00\x00" * 100),
+    ("/text", json.dumps({"text": 42})),
+    ("/text", json.dumps({"text": None})),
+    ("/text", json.dumps(["open firefox"])),
+    ("/text", b"\xff\xfe not json"),
+])
+def test_bad_input_is_a_client_error(make_server, path, body):
+    status, payload = request(make_server(), "POST", path, body)
+    assert status == 400
+    assert payload["error"]
+
+
+def test_body_over_the_limit_is_refused_before_reading(make_server):
+    server = make_server(max_body=1000)
+    status, _ = request(server, "POST", "/transcribe", b"\x00" * 2000)
+    assert status == 413
+
+
+def test_chunked_body_over_the_limit_is_refused(make_server):
+    server = make_server(max_body=1000)
+    chunks = iter([b"\x00" * 600, b"\x00" * 600])
+    status, _ = request(server, "POST", "/transcribe", chunks, {"Transfer-Encoding": "chunked"}, encode_chunked=True)
+    assert status == 413
+
+
+def test_token_is_required_when_set(make_server):
+    server = make_server(token="secret")
+    body = json.dumps({"text": "volume 40"})
+    assert request(server, "POST", "/text", body)[0] == 401
+    assert request(server, "POST", "/text", body, {"Authorization": "Bearer wrong"})[0] == 401
+    assert request(server, "GET", "/stats")[0] == 401
+    assert request(server, "POST", "/text", body, {"Authorization": "Bearer secret"})[0] == 200
+
+
+class ScreenshotBackend:
+    def __init__(self):
+        self.paths = []
+
+    def take_screenshot(self, path):
+        self.paths.append(path)
+        return ActionResult(argv=["screenshot", path], returncode=0)
+
+
+@pytest.mark.parametrize("filename", ["../escape.png", "/tmp/escape.png", "sub/dir.png", "..", ""])
+def test_screenshot_filename_must_stay_in_screenshots(tmp_path, monkeypatch, filename):
+    monkeypatch.chdir(tmp_path)
+    backend = ScreenshotBackend()
+    with pytest.raises(ActionFailed):
+        ComputerControl(backend=backend).take_screenshot(filename)
+    assert backend.paths == []
+
+
+def test_screenshot_is_saved_in_screenshots(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    backend = ScreenshotBackend()
+    ComputerControl(backend=backend).take_screenshot("desk.png")
+    assert backend.paths == ["screenshots/desk.png"]
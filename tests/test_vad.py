@@ -0,0 +1,82 @@
+import numpy as np
+
+from services.vad import VoiceActivityDetector
+
+RATE = 16000
+BLOCK = 1024  # Samples per sounddevice callback block
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.float32)
+
+
+def tone(seconds, frequency=220.0, amplitude=0.3):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def noise(seconds, amplitude=0.3):
+    return np.random.default_rng(0).uniform(-amplitude, amplitude, int(seconds * RATE)).astype(np.float32)
+
+
+def blocks(*parts):
+    """int16 (frames, 1) blocks, shaped like a mono InputStream's"""
+    pcm = (np.concatenate(parts) * 32767).astype(np.int16).reshape(-1, 1)
+    return [pcm[i:i + BLOCK] for i in range(0, len(pcm), BLOCK)]
+
+
+def test_silence_never_triggers():
+    vad = VoiceActivityDetector(sample_rate=RATE)
+    audio = vad.collect(blocks(silence(2.0)))
+    assert len(audio) == 0
+    assert not vad.triggered and not vad.finished
+
+
+def test_broadband_noise_is_not_speech():
+    vad = VoiceActivityDetector(sample_rate=RATE)
+    assert len(vad.collect(blocks(noise(2.0)))) == 0
+
+
+def test_tone_burst_is_captured_with_pre_roll_and_trailing_silence_trimmed():
+    vad = VoiceActivityDetector(sample_rate=RATE, silence_duration=0.5, pre_roll=0.3)
+    audio = vad.collect(blocks(silence(1.0), tone(1.0), silence(1.0)))
+    assert vad.finished
+    # The whole burst plus at most the pre-roll and onset frames before it
+    assert RATE * 1.0 <= len(audio) <= RATE * (1.0 + 0.3 + 0.1)
+    # Ends where the tone ends: no trailing silence
+    assert np.abs(audio[-vad.frame_size:]).max() > 0.1
+
+
+def test_short_pause_does_not_end_the_utterance():
+    vad = VoiceActivityDetector(sample_rate=RATE, silence_duration=0.8)
+    audio = vad.collect(blocks(silence(0.5), tone(0.6), silence(0.3), tone(0.6), silence(1.5)))
+    assert vad.finished
+    assert len(audio) >= RATE * 1.5
+
+
+def test_collect_stops_after_trailing_silence():
+    vad = VoiceActivityDetector(sample_rate=RATE, silence_duration=0.5)
+    consumed = []
+
+    def stream():
+        for block in blocks(silence(0.3), tone(0.5), silence(3.0)):
+            consumed.append(block)
+            yield block
+
+    vad.collect(stream())
+    # Reading stops about half a second into the trailing silence, not at the end of the stream
+    assert sum(len(block) for block in consumed) < RATE * (0.3 + 0.5 + 0.5 + 0.2)
+
+
+def test_max_duration_caps_continuous_speech():
+    vad = VoiceActivityDetector(sample_rate=RATE, max_duration=2.0)
+    audio = vad.collect(blocks(tone(5.0)))
+    assert vad.finished
+    assert RATE * 1.9 <= len(audio) <= RATE * 2.0 + vad.frame_size
+
+
+def test_collect_resets_between_utterances():
+    vad = VoiceActivityDetector(sample_rate=RATE, silence_duration=0.5)
+    vad.collect(blocks(silence(0.2), tone(1.0), silence(1.0)))
+    assert len(vad.collect(blocks(silence(1.0)))) == 0
+    assert not vad.triggered
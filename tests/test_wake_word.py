@@ -0,0 +1,69 @@
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+
+from services.wake_word import WakeWordDetector
+
+
+class FakeInputStream:
+    """Delivers silent blocks from a thread and takes a while to close, like PortAudio"""
+
+    open_streams = 0
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback):
+        self.blocksize = blocksize
+        self.callback = callback
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.wait(0.01):
+            self.callback(np.zeros((self.blocksize, 1), dtype=np.float32), self.blocksize, None, None)
+
+    def __enter__(self):
+        FakeInputStream.open_streams += 1
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        time.sleep(0.2)
+        FakeInputStream.open_streams -= 1
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_pause_returns_once_the_stream_is_closed(monkeypatch):
+    monkeypatch.setitem(sys.modules, "sounddevice", types.SimpleNamespace(InputStream=FakeInputStream))
+    detector = WakeWordDetector(phrase="hey nagato", model_name="tiny")
+    detector._running.set()
+    thread = threading.Thread(target=detector._listen, daemon=True)
+    thread.start()
+    try:
+        assert wait_for(lambda: FakeInputStream.open_streams == 1)
+        assert detector.pause()
+        assert FakeInputStream.open_streams == 0
+
+        detector.resume()
+        assert wait_for(lambda: FakeInputStream.open_streams == 1)
+    finally:
+        detector.pause()
+        detector.stop()
+        thread.join(timeout=2.0)
+    assert FakeInputStream.open_streams == 0
+
+
+def test_pause_without_a_listener_returns_at_once():
+    detector = WakeWordDetector(phrase="hey nagato", model_name="tiny")
+    start = time.perf_counter()
+    assert detector.pause()
+    assert time.perf_counter() - start < 0.1